@@ -10,16 +10,19 @@ import os
 import sys
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.logging_config import setup_logging, get_logger
 from src.config import config
-from src.document_loader import DocumentProcessor
-from src.vector_store import VectorStoreManager
-from src.rag_pipeline import RAGPipeline
-from src.chat_interface import ChatInterface, SimpleChatInterface
+
+# Heavy modules (langchain, chromadb, gradio) are imported inside the functions
+# that need them so `--help` and `--mode build` start quickly. Profile with:
+#   python -X importtime app.py --help 2> importtime.log
+if TYPE_CHECKING:
+    from src.rag_pipeline import RAGPipeline
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -66,28 +69,43 @@ def parse_arguments():
         help="Don't open browser automatically"
     )
     
+    parser.add_argument(
+        "--loader-workers", 
+        type=int, 
+        default=None,
+        help="Number of parallel document loader workers (overrides LOADER_WORKERS)"
+    )
+    
     return parser.parse_args()
 
-def initialize_system(rebuild_db: bool = False):
+def initialize_system(rebuild_db: bool = False, max_workers: int = None):
     """Initialize the complete system"""
+    from src.document_loader import DocumentProcessor
+    from src.vector_store import VectorStoreManager
+    from src.rag_pipeline import RAGPipeline
+    
     logger = get_logger(__name__)
     
     try:
         logger.info("🔄 Initializing Company Knowledge Worker system...")
         
-        # Initialize document processor
-        logger.info("📚 Initializing document processor...")
-        doc_processor = DocumentProcessor()
-        
         # Initialize vector store manager
         logger.info("🗂️ Initializing vector store manager...")
         vector_store_manager = VectorStoreManager()
         
-        # Load or create vector store
+        # Warm up the OpenAI connection while documents load
+        vector_store_manager.start_warmup()
+        
+        # Initialize document processor
+        logger.info("📚 Initializing document processor...")
+        doc_processor = DocumentProcessor()
+        
+        # Load or create vector store; the walk's stats are recorded in the manifest
+        files = doc_processor.find_corpus_files()
         if rebuild_db:
             logger.info("🔄 Rebuilding vector database...")
-            documents = doc_processor.load_all_documents()
-            vector_store_manager.create_vectorstore(documents, force_recreate=True)
+            documents = doc_processor.load_all_documents(max_workers=max_workers, files=files)
+            vector_store_manager.create_vectorstore(documents, force_recreate=True, files=files)
         else:
             # Try to load existing vector store first
             logger.info("🔍 Checking for existing vector store...")
@@ -95,8 +113,17 @@ def initialize_system(rebuild_db: bool = False):
             
             if vectorstore is None:
                 logger.info("🔄 No existing vector store found. Creating new one...")
-                documents = doc_processor.load_all_documents()
-                vector_store_manager.create_vectorstore(documents)
+                documents = doc_processor.load_all_documents(max_workers=max_workers, files=files)
+                vector_store_manager.create_vectorstore(documents, files=files)
+            else:
+                # Only files whose size or mtime differ from the manifest are loaded and chunked
+                changed, removed = vector_store_manager.changed_files(files)
+                if changed or removed:
+                    logger.info(f"🔄 Syncing vector store: {len(changed)} changed files, {len(removed)} removed...")
+                    documents = doc_processor.load_all_documents(max_workers=max_workers, files=changed)
+                    vector_store_manager.sync(documents, files=files, reloaded={file.path for file in changed})
+                else:
+                    logger.info("✅ Vector store is up to date with the documents")
         
         # Initialize RAG pipeline
         logger.info("🤖 Initializing RAG pipeline...")
@@ -104,7 +131,7 @@ def initialize_system(rebuild_db: bool = False):
         
         # Test the pipeline
         logger.info("🧪 Testing RAG pipeline...")
-        test_result = rag_pipeline.test_pipeline()
+        test_result = rag_pipeline.test_pipeline_cached()
         
         if test_result["success"]:
             logger.info("✅ System initialization completed successfully!")
@@ -117,8 +144,10 @@ def initialize_system(rebuild_db: bool = False):
         logger.error(f"❌ System initialization failed: {e}")
         raise
 
-def run_web_interface(rag_pipeline: RAGPipeline, port: int = None, share: bool = False, open_browser: bool = True):
+def run_web_interface(rag_pipeline: "RAGPipeline", port: int = None, share: bool = False, open_browser: bool = True):
     """Run the web interface"""
+    from src.chat_interface import ChatInterface
+    
     logger = get_logger(__name__)
     
     try:
@@ -140,8 +169,10 @@ def run_web_interface(rag_pipeline: RAGPipeline, port: int = None, share: bool =
         logger.info("💡 Falling back to command line interface...")
         run_cli_interface(rag_pipeline)
 
-def run_cli_interface(rag_pipeline: RAGPipeline):
+def run_cli_interface(rag_pipeline: "RAGPipeline"):
     """Run the command line interface"""
+    from src.chat_interface import SimpleChatInterface
+    
     logger = get_logger(__name__)
     
     try:
@@ -155,8 +186,11 @@ def run_cli_interface(rag_pipeline: RAGPipeline):
         logger.error(f"❌ Command line interface failed: {e}")
         raise
 
-def build_vector_store():
+def build_vector_store(max_workers: int = None):
     """Build/rebuild vector store only"""
+    from src.document_loader import DocumentProcessor
+    from src.vector_store import VectorStoreManager
+    
     logger = get_logger(__name__)
     
     try:
@@ -166,11 +200,12 @@ def build_vector_store():
         doc_processor = DocumentProcessor()
         
         # Load all documents
-        documents = doc_processor.load_all_documents()
+        files = doc_processor.find_corpus_files()
+        documents = doc_processor.load_all_documents(max_workers=max_workers, files=files)
         
         # Initialize vector store manager and create store
         vector_store_manager = VectorStoreManager()
-        vector_store_manager.create_vectorstore(documents, force_recreate=True)
+        vector_store_manager.create_vectorstore(documents, force_recreate=True, files=files)
         
         # Get stats
         stats = vector_store_manager.get_stats()
@@ -253,12 +288,12 @@ def main():
         
         # Handle different modes
         if args.mode == "build":
-            build_vector_store()
+            build_vector_store(max_workers=args.loader_workers)
             logger.info("✅ Vector store build completed!")
             return 0
         
         # Initialize system
-        rag_pipeline = initialize_system(rebuild_db=args.rebuild_db)
+        rag_pipeline = initialize_system(rebuild_db=args.rebuild_db, max_workers=args.loader_workers)
         
         # Run appropriate interface
         if args.mode == "web":
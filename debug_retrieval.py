@@ -6,6 +6,8 @@ Debug script to investigate retrieval issues with project information
 import sys
 sys.path.insert(0, 'src')
 
+import pandas as pd
+
 from src.config import config
 from src.vector_store import VectorStoreManager
 from src.document_loader import DocumentProcessor
@@ -41,15 +43,26 @@ def debug_project_retrieval():
         "Precision Agriculture project"
     ]
     
-    for query in test_queries:
+    # Embed all queries in one request and search once per query at the
+    # largest k; smaller k values are prefixes of the same ranking
+    k_values = [5, 10, 20]
+    query_vectors = vector_store_manager.embeddings.embed_documents(test_queries)
+    
+    for query, query_vector in zip(test_queries, query_vectors):
         print(f"\n🔍 Query: '{query}'")
         print("-" * 40)
         
+        try:
+            all_results = vectorstore.similarity_search_by_vector(query_vector, k=max(k_values))
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            continue
+        
         # Get similar documents with different k values
-        for k in [5, 10, 20]:
+        for k in k_values:
             print(f"\n📋 Retrieving top {k} chunks:")
             try:
-                results = vector_store_manager.search_similar_documents(query, k=k)
+                results = all_results[:k]
                 
                 # Group by document type and project
                 doc_types = {}
@@ -96,44 +109,36 @@ def analyze_project_chunks():
         print("❌ No existing vector store found!")
         return
     
-    # Get all chunks
+    # Get project chunks only
     try:
-        viz_data = vector_store_manager.get_visualization_data()
-        metadatas = viz_data['metadatas']
-        documents = viz_data['documents']
+        project_data = vector_store_manager.get_chunks_by_filter({'doc_type': 'Projects'})
+        metadatas = project_data['metadatas']
+        documents = project_data['documents']
         
-        # Analyze project chunks
-        project_chunks = {}
-        project_content_lengths = {}
+        # Aggregate project chunks with a single vectorized groupby
+        df = pd.DataFrame(metadatas).reindex(columns=['doc_type', 'project', 'source'])
+        df['content'] = documents
+        df['content_length'] = df['content'].str.len()
+        project_df = df[df['doc_type'] == 'Projects'].fillna({'project': 'Unknown', 'source': 'unknown'})
         
-        for i, metadata in enumerate(metadatas):
-            if metadata.get('doc_type') == 'Projects':
-                project = metadata.get('project', 'Unknown')
-                content = documents[i]
-                
-                if project not in project_chunks:
-                    project_chunks[project] = []
-                    project_content_lengths[project] = []
-                
-                project_chunks[project].append({
-                    'source': metadata.get('source', 'unknown'),
-                    'content_length': len(content),
-                    'content_preview': content[:200] + '...' if len(content) > 200 else content
-                })
-                project_content_lengths[project].append(len(content))
+        project_stats = project_df.groupby('project', sort=False).agg(
+            num_chunks=('source', 'size'),
+            avg_length=('content_length', 'mean'),
+            sources=('source', lambda paths: set(path.rsplit('/', 1)[-1] for path in paths)),
+            sample=('content', 'first')
+        )
         
         # Report findings
         print(f"📊 Project Analysis:")
-        for project, chunks in project_chunks.items():
-            avg_length = sum(project_content_lengths[project]) / len(project_content_lengths[project])
+        for project, row in project_stats.iterrows():
             print(f"\n🎯 {project}:")
-            print(f"   - Number of chunks: {len(chunks)}")
-            print(f"   - Average chunk length: {avg_length:.0f} characters")
-            print(f"   - Sources: {set(chunk['source'].split('/')[-1] for chunk in chunks)}")
+            print(f"   - Number of chunks: {row.num_chunks}")
+            print(f"   - Average chunk length: {row.avg_length:.0f} characters")
+            print(f"   - Sources: {row.sources}")
             
             # Show a sample chunk
-            if chunks:
-                print(f"   - Sample content: {chunks[0]['content_preview']}")
+            sample = row['sample']
+            print(f"   - Sample content: {sample[:200] + '...' if len(sample) > 200 else sample}")
     
     except Exception as e:
         print(f"❌ Error analyzing chunks: {e}")
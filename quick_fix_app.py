@@ -6,6 +6,7 @@ Addresses the chunking and retrieval issues with minimal changes.
 """
 
 import os
+import re
 import sys
 import argparse
 from pathlib import Path
@@ -15,12 +16,25 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.logging_config import setup_logging, get_logger
 from src.config import config
-from src.document_loader import DocumentProcessor
-from src.vector_store import VectorStoreManager
-from src.rag_pipeline import RAGPipeline
-from src.chat_interface import ChatInterface, SimpleChatInterface
+from src.rag_pipeline import RAGPipeline, CONDENSE_QUESTION_PROMPT, QA_PROMPT, get_llm, stream_chain_answer
 from src.port_manager import PortManager
 
+# Gradio, the vector store and langchain chains are imported where they are
+# used to keep startup light. Profile with:
+#   python -X importtime quick_fix_app.py --help 2> importtime.log
+
+# Phrases that mark a question as a project overview request, matched
+# case-insensitively in a single pass by one compiled alternation
+_OVERVIEW_KEYWORDS = (
+    'what projects', 'all projects', 'current projects', 
+    'projects working on', 'list projects', 'company projects',
+    'projects is artiligence', 'artiligence projects'
+)
+_OVERVIEW_PATTERN = re.compile("|".join(map(re.escape, _OVERVIEW_KEYWORDS)), re.IGNORECASE)
+
+# Answers kept in the semantic cache; the least recently used are evicted first
+ANSWER_CACHE_SIZE = 512
+
 class QuickFixRAGPipeline(RAGPipeline):
     """RAG Pipeline with quick fixes for better project coverage"""
     
@@ -28,22 +42,13 @@ class QuickFixRAGPipeline(RAGPipeline):
         """Initialize with improved retrieval settings"""
         try:
             # Initialize the language model
-            from langchain_openai import ChatOpenAI
-            self.llm = ChatOpenAI(
-                temperature=0.7, 
-                model_name=config.MODEL,
-                openai_api_key=config.OPENAI_API_KEY
-            )
+            self.llm = get_llm(config.MODEL, 0.7, streaming=True)
+            self.condense_llm = get_llm(config.MODEL, 0)
             logger = get_logger(__name__)
             logger.info(f"Language model initialized: {config.MODEL}")
             
-            # Set up conversation memory
-            from langchain.memory import ConversationBufferMemory
-            self.memory = ConversationBufferMemory(
-                memory_key='chat_history', 
-                return_messages=True
-            )
-            logger.info("Conversation memory initialized")
+            # Set up conversation memory, summarized by the non-streaming model like the base pipeline
+            self.memory = self._create_memory()
             
             # Create retriever with HIGHER k for better coverage
             retriever = self.vector_store_manager.create_retriever(
@@ -56,10 +61,39 @@ class QuickFixRAGPipeline(RAGPipeline):
             self.conversation_chain = ConversationalRetrievalChain.from_llm(
                 llm=self.llm, 
                 retriever=retriever, 
-                memory=self.memory
+                memory=self.memory,
+                condense_question_llm=self.condense_llm,
+                condense_question_prompt=CONDENSE_QUESTION_PROMPT,
+                combine_docs_chain_kwargs={"prompt": QA_PROMPT}
             )
             logger.info("Conversational RAG chain created with improved settings")
             
+            # Project overview questions retrieve from project documents only,
+            # sharing memory with the main chain; MMR spreads the results across projects
+            self.project_retriever = self.vector_store_manager.create_retriever(
+                search_kwargs={"k": 40, "filter": {"doc_type": "Projects"}},
+                search_type="mmr"
+            )
+            self.project_chain = ConversationalRetrievalChain.from_llm(
+                llm=self.llm, 
+                retriever=self.project_retriever, 
+                memory=self.memory,
+                condense_question_llm=self.condense_llm,
+                condense_question_prompt=CONDENSE_QUESTION_PROMPT,
+                combine_docs_chain_kwargs={"prompt": QA_PROMPT}
+            )
+            logger.info("Project overview chain created with MMR k=40 filtered to project documents")
+            
+            # Semantic cache of answers keyed by question embedding, valid for one version of the index
+            from src.semantic_cache import SemanticCache
+            self.semantic_cache = SemanticCache(
+                threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                persist_path=os.path.join(config.CACHE_DIR, "semantic_cache", "quick_fix_answers"),
+                max_entries=ANSWER_CACHE_SIZE,
+                version=self.vector_store_manager.index_version()
+            )
+            logger.info(f"Semantic answer cache ready ({len(self.semantic_cache)} entries)")
+            
         except Exception as e:
             logger = get_logger(__name__)
             logger.error(f"Error initializing improved RAG pipeline: {e}")
@@ -73,24 +107,22 @@ class QuickFixRAGPipeline(RAGPipeline):
             raise ValueError("RAG pipeline not initialized")
         
         try:
-            # Enhanced project query handling
+            # Serve repeat or near-duplicate questions from the semantic cache
+            query_vector, cached_answer = self._cached_answer(question)
+            if cached_answer is not None:
+                logger.info(f"Semantic cache hit for question: {question}")
+                self._remember_turn(question, cached_answer)
+                return {
+                    "question": question,
+                    "answer": cached_answer,
+                    "success": True,
+                    "cached": True
+                }
+            
+            # Project overview queries use the project-filtered chain
             if self._is_project_overview_query(question):
-                # For project overview queries, add context hint
-                enhanced_question = f"""
-                {question}
-                
-                Please provide information about ALL current company projects. Make sure to cover:
-                - SQL Server Upgrades (database infrastructure projects)
-                - SFMS Mining Analytics (mining operations and analytics)
-                - Precision Agriculture Asset Management (farming and GIS solutions)
-                - Database Migration (legacy system migrations)
-                - Advanced Driver Assistance System (vehicle telematics)
-                
-                List each project with details about what work is being done.
-                """
-                
-                logger.info(f"Enhanced project overview query: {question}")
-                result = self.conversation_chain.invoke({"question": enhanced_question})
+                logger.info(f"Processing project overview query: {question}")
+                result = self.project_chain.invoke({"question": question})
             else:
                 logger.info(f"Processing standard question: {question}")
                 result = self.conversation_chain.invoke({"question": question})
@@ -100,6 +132,8 @@ class QuickFixRAGPipeline(RAGPipeline):
                 "answer": result["answer"],
                 "success": True
             }
+            if query_vector is not None:
+                self.semantic_cache.add(query_vector, result["answer"])
             
             logger.info("Successfully answered question")
             return response
@@ -113,15 +147,61 @@ class QuickFixRAGPipeline(RAGPipeline):
                 "error": str(e)
             }
     
+    def ask_question_stream(self, question: str):
+        """Stream an answer, serving repeat questions from the semantic cache"""
+        logger = get_logger(__name__)
+        
+        if not self.conversation_chain:
+            raise ValueError("RAG pipeline not initialized")
+        
+        try:
+            query_vector, cached_answer = self._cached_answer(question)
+            if cached_answer is not None:
+                logger.info(f"Semantic cache hit for question: {question}")
+                self._remember_turn(question, cached_answer)
+                yield cached_answer
+                return
+            
+            logger.info(f"Processing streamed question: {question}")
+            answer = ""
+            for answer in stream_chain_answer(self._select_chain(question), {"question": question}):
+                yield answer
+            if query_vector is not None and answer:
+                self.semantic_cache.add(query_vector, answer)
+            
+        except Exception as e:
+            logger.error(f"Error processing question: {e}")
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    def _cached_answer(self, question: str):
+        """Return (query vector, cached answer), or (None, None) for follow-ups that depend on the conversation"""
+        from src.semantic_cache import is_follow_up
+        
+        # Memory is shared by every web session, so only the question itself can mark a follow-up
+        if is_follow_up(question):
+            return None, None
+        
+        # Answers from before a rebuild or sync describe documents that may have changed
+        self.semantic_cache.set_version(self.vector_store_manager.index_version())
+        query_vector = self.vector_store_manager.embeddings.embed_query(question)
+        return query_vector, self.semantic_cache.lookup(query_vector)
+    
+    def _remember_turn(self, question: str, answer: str):
+        """Record a cache-served turn in memory, as the chain would have"""
+        try:
+            self.memory.save_context({"question": question}, {"answer": answer})
+        except Exception as e:
+            get_logger(__name__).warning(f"Could not save cached answer to memory: {e}")
+    
+    def _select_chain(self, question: str):
+        """Route project overview questions to the project-filtered chain"""
+        if self._is_project_overview_query(question):
+            return self.project_chain
+        return self.conversation_chain
+    
     def _is_project_overview_query(self, question: str) -> bool:
         """Check if this is asking for project overview"""
-        overview_keywords = [
-            'what projects', 'all projects', 'current projects', 
-            'projects working on', 'list projects', 'company projects',
-            'projects is artiligence', 'artiligence projects'
-        ]
-        question_lower = question.lower()
-        return any(keyword in question_lower for keyword in overview_keywords)
+        return _OVERVIEW_PATTERN.search(question) is not None
 
 def main():
     """Main application entry point with quick fixes"""
@@ -143,14 +223,17 @@ def main():
     logger.info("   Better Project Coverage with k=25 retrieval")
     logger.info("="*60)
     
+    from src.vector_store import VectorStoreManager
+    from src.chat_interface import ChatInterface, SimpleChatInterface
+    
     try:
         # Initialize components
-        logger.info("📚 Initializing document processor...")
-        doc_processor = DocumentProcessor()
-        
         logger.info("🗂️ Initializing vector store manager...")
         vector_store_manager = VectorStoreManager()
         
+        # Warm up the OpenAI connection while the store and pipeline load
+        vector_store_manager.start_warmup()
+        
         # Load existing vector store
         logger.info("🔍 Loading existing vector store...")
         vectorstore = vector_store_manager.load_existing_vectorstore()
@@ -166,7 +249,7 @@ def main():
         
         # Test the pipeline
         logger.info("🧪 Testing pipeline...")
-        test_result = rag_pipeline.test_pipeline()
+        test_result = rag_pipeline.test_pipeline_cached()
         
         if test_result["success"]:
             logger.info("✅ Quick Fix pipeline ready!")
@@ -181,12 +264,6 @@ def main():
             preferred_port = args.port or 7860
             port_manager = PortManager(preferred_port=preferred_port)
             
-            # Clean up any old processes first
-            logger.info("🧹 Cleaning up old processes...")
-            cleaned_count = port_manager.cleanup_old_processes()
-            if cleaned_count > 0:
-                logger.info(f"Cleaned up {cleaned_count} old processes")
-            
             # Ensure port is available
             logger.info(f"🔧 Ensuring port {preferred_port} is available...")
             available_port = port_manager.ensure_port_available(
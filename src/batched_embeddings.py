@@ -0,0 +1,125 @@
+"""
+Query embedding micro-batcher for Company Knowledge Worker
+"""
+
+import time
+import queue
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+def unit_vectors(vectors) -> List[List[float]]:
+    """Scale each row to unit length, so inner product equals cosine similarity"""
+    array = np.asarray(vectors, dtype=np.float32)
+    if array.size == 0:
+        return []
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    return (array / np.where(norms == 0, 1, norms)).tolist()
+
+class BatchedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper that coalesces concurrent embed_query calls into one request"""
+
+    def __init__(
+        self,
+        base: Embeddings,
+        max_batch: int = 8,
+        max_wait: float = 0.02,
+        cache_size: int = 1024,
+        persistent_cache: Optional[EmbeddingCache] = None,
+        normalize: bool = False
+    ):
+        self.base = base
+        # Return unit-length vectors (for inner-product indexes)
+        self.normalize = normalize
+        # Disk cache behind the in-memory one, so repeated queries survive restarts
+        self.persistent_cache = persistent_cache
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        # Precomputed vectors for known queries (e.g. UI example questions)
+        self._primed: Dict[str, List[float]] = {}
+        # Exact-match cache, so repeated strings (e.g. fixed project probes) skip the request entirely
+        self._cached_query = lru_cache(maxsize=cache_size)(self._embed_uncached)
+        self._worker = threading.Thread(target=self._run, name="query-embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) == 1:
+            return [self.embed_query(texts[0])]
+        return self._finish(self.base.embed_documents(texts))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._finish(await self.base.aembed_documents(texts))
+
+    def _finish(self, vectors: List[List[float]]) -> List[List[float]]:
+        return unit_vectors(vectors) if self.normalize else vectors
+
+    def prime(self, texts: Iterable[str]) -> None:
+        """Embed known queries up front so later embed_query calls for them are free"""
+        texts = [text for text in dict.fromkeys(texts) if text not in self._primed]
+        if not texts:
+            return
+        for text, vector in zip(texts, self._finish(self.base.embed_documents(texts))):
+            self._primed[text] = vector
+        logger.info(f"Primed embeddings for {len(texts)} queries")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, sharing the request with any queries arriving at the same time"""
+        primed = self._primed.get(text)
+        if primed is not None:
+            return primed
+        return self._cached_query(text)
+
+    def _embed_uncached(self, text: str) -> List[float]:
+        key = None
+        if self.persistent_cache is not None:
+            key = self.persistent_cache.key_for(text)
+            stored = self.persistent_cache.get_many([key]).get(key)
+            if stored is not None:
+                return self._finish([stored])[0]
+
+        future = Future()
+        self._pending.put((text, future))
+        vector = self._finish([future.result()])[0]
+        if key is not None:
+            self.persistent_cache.set_many([(key, vector)])
+        return vector
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """Block for one query, then collect more until max_batch or max_wait"""
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                vectors = self.base.embed_documents([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Error embedding query batch: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.debug(f"Embedded {len(batch)} concurrent queries in one request")
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
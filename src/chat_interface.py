@@ -2,30 +2,234 @@
 Gradio chat interface for Company Knowledge Worker
 """
 
+import sys
+import time
+import uuid
 import logging
-from typing import List, Tuple, Optional
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Tuple, Optional
 
 import gradio as gr
 
+# Importing readline gives the CLI's input() line editing and history
+try:
+    import readline  # noqa: F401
+except ImportError:
+    pass
+
 from .rag_pipeline import RAGPipeline
+from .semantic_cache import is_follow_up
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds and new characters between streamed UI updates (~20/s);
+# faster yields make the Gradio client re-render on every token
+STREAM_UPDATE_INTERVAL = 0.05
+STREAM_MIN_CHARS = 8
+
+# Longest a question waits for the startup warmup to finish
+WARMUP_WAIT_TIMEOUT = 10
+
+# Conversations kept server-side; the least recently active are dropped first
+MAX_SESSIONS = 256
+
+# Answers kept for repeated questions (e.g. example button clicks)
+ANSWER_CACHE_SIZE = 512
+_ERROR_PREFIX = "Sorry, I encountered an error"
+
+# Static UI content, built once at import time
+_DESCRIPTION = """
+        Ask me anything about company documents, projects, invoices, contracts, and more! 
+        
+        **Enhanced with comprehensive project knowledge including:**
+        - SQL Server upgrades and database infrastructure
+        - Precision agriculture and asset management systems  
+        - Mining analytics and fleet management (SFMS)
+        - Database migration projects
+        - Advanced driver assistance systems (ADAS)
+        
+        **Document types covered:**
+        - Company documents and contracts
+        - Project documentation and specifications
+        - Financial records and invoices
+        - Technical documentation and scripts
+        """
+
+# Pre-rendered equivalent of the title, _DESCRIPTION and the examples heading
+_HEADER_HTML = """
+<h1>🏢 Company Knowledge Worker</h1>
+<p>Ask me anything about company documents, projects, invoices, contracts, and more!</p>
+<p><strong>Enhanced with comprehensive project knowledge including:</strong></p>
+<ul>
+  <li>SQL Server upgrades and database infrastructure</li>
+  <li>Precision agriculture and asset management systems</li>
+  <li>Mining analytics and fleet management (SFMS)</li>
+  <li>Database migration projects</li>
+  <li>Advanced driver assistance systems (ADAS)</li>
+</ul>
+<p><strong>Document types covered:</strong></p>
+<ul>
+  <li>Company documents and contracts</li>
+  <li>Project documentation and specifications</li>
+  <li>Financial records and invoices</li>
+  <li>Technical documentation and scripts</li>
+</ul>
+<h2>💡 Quick Questions (Click to use):</h2>
+"""
+
+_EXAMPLES = (
+    "What projects is the company working on?",
+    "Tell me about the SQL Server upgrade project",
+    "What is the Precision Agriculture Asset Management project?",
+    "Describe the SFMS Mining Analytics project", 
+    "What database migration work is being done?",
+    "Tell me about the company's invoices and financial information",
+    "What contracts does the company have?",
+    "Summarize the company's business activities",
+    "What technical documentation is available?",
+    "Tell me about the Advanced Driver Assistance System project"
+)
+
+_CSS = """
+        .gradio-container {
+            max-width: 1200px !important;
+        }
+        .chat-message {
+            font-size: 16px !important;
+        }
+        /* Style for example buttons */
+        button[variant="secondary"] {
+            margin: 2px !important;
+            padding: 8px 12px !important;
+            font-size: 13px !important;
+            line-height: 1.2 !important;
+            text-align: left !important;
+            white-space: normal !important;
+            word-wrap: break-word !important;
+            min-height: 45px !important;
+            max-height: 60px !important;
+        }
+        /* Ensure buttons expand to fill column width */
+        .gr-button {
+            width: 100% !important;
+        }
+        /* Style the header sections */
+        h1, h2 {
+            margin-bottom: 10px !important;
+        }
+        /* Chat container styling */
+        .chatbot {
+            border-radius: 8px !important;
+        }
+        """
+
+def _gate(snapshots: Iterator[str], min_interval: float = STREAM_UPDATE_INTERVAL,
+          min_chars: int = STREAM_MIN_CHARS) -> Iterator[str]:
+    """Thin out a stream of growing answer snapshots, always ending on the full answer"""
+    pending = None
+    published_len = 0
+    last_yield = float('-inf')  # publish the first chunk immediately
+    for snapshot in snapshots:
+        pending = snapshot
+        now = time.monotonic()
+        if now - last_yield >= min_interval and len(snapshot) - published_len >= min_chars:
+            yield snapshot
+            pending = None
+            published_len = len(snapshot)
+            last_yield = now
+    if pending is not None:
+        yield pending
+
 class ChatInterface:
     """Manages the Gradio chat interface"""
     
     def __init__(self, rag_pipeline: RAGPipeline):
         self.rag_pipeline = rag_pipeline
         self.interface = None
+        self._answer_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._answer_cache_lock = threading.Lock()
+        self._sessions: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._warmed_up = threading.Event()
+        threading.Thread(target=self._warmup, name="chat-warmup", daemon=True).start()
         
-    def chat_function(self, message: str, history: List[Tuple[str, str]]) -> str:
-        """Chat function for Gradio interface"""
+    def _session_history(self, session_id: str) -> List[dict]:
+        """Get the server-side chat history for a browser session"""
+        with self._sessions_lock:
+            history = self._sessions.setdefault(session_id, [])
+            self._sessions.move_to_end(session_id)
+            if len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+        return history
+    
+    def _warmup(self) -> None:
+        """Prime example embeddings and load the vector index before the first question"""
+        try:
+            vector_store_manager = getattr(self.rag_pipeline, "vector_store_manager", None)
+            embeddings = getattr(vector_store_manager, "embeddings", None)
+            
+            # Embed the example questions in one request so their first click skips the embedding call
+            prime = getattr(embeddings, "prime", None)
+            if prime is not None:
+                prime(_EXAMPLES)
+            
+            # A tiny search pulls the HNSW index into memory
+            vectorstore = vector_store_manager.get_vectorstore() if vector_store_manager else None
+            if vectorstore is not None and embeddings is not None:
+                vectorstore.similarity_search_by_vector(embeddings.embed_query(_EXAMPLES[0]), k=1)
+            
+            logger.info("Chat interface warmup complete")
+        except Exception as e:
+            logger.warning("Chat interface warmup failed: %s", e)
+        finally:
+            self._warmed_up.set()
+    
+    def chat_function(self, message: str, history: List[dict]) -> Iterator[str]:
+        """Chat function for Gradio interface, streaming the answer as it is generated"""
         try:
-            result = self.rag_pipeline.ask_question(message)
-            return result["answer"]
+            yield from self._stream_answer(message)
         except Exception as e:
-            logger.error(f"Chat function error: {e}")
-            return f"Sorry, I encountered an error: {str(e)}"
+            logger.error("Chat function error: %s", e)
+            yield f"{_ERROR_PREFIX}: {str(e)}"
+    
+    def _stream_answer(self, message: str) -> Iterator[str]:
+        """Yield the growing answer, serving repeated standalone questions from the answer cache"""
+        key = " ".join(message.casefold().split())
+        cacheable = not is_follow_up(key)
+        
+        if cacheable:
+            with self._answer_cache_lock:
+                cached_answer = self._answer_cache.get(key)
+                if cached_answer is not None:
+                    self._answer_cache.move_to_end(key)
+            if cached_answer is not None:
+                logger.info("Answer cache hit for question: %s", message)
+                yield cached_answer
+                return
+        
+        # Don't race the warmup on the very first question
+        self._warmed_up.wait(timeout=WARMUP_WAIT_TIMEOUT)
+        
+        answer = None
+        for answer in self._generate_answer(message):
+            yield answer
+        
+        if cacheable and answer and not answer.startswith(_ERROR_PREFIX):
+            with self._answer_cache_lock:
+                self._answer_cache[key] = answer
+                self._answer_cache.move_to_end(key)
+                if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+                    self._answer_cache.popitem(last=False)
+    
+    def _generate_answer(self, message: str) -> Iterator[str]:
+        """Yield the growing answer, falling back to a blocking call for non-streaming pipelines"""
+        ask_question_stream = getattr(self.rag_pipeline, "ask_question_stream", None)
+        if ask_question_stream is None:
+            yield self.rag_pipeline.ask_question(message)["answer"]
+            return
+        
+        yield from _gate(ask_question_stream(message))
     
     def create_interface(self) -> gr.Blocks:
         """Create the enhanced Gradio chat interface with persistent examples"""
@@ -33,33 +237,28 @@ class ChatInterface:
             with gr.Blocks(
                 title="🏢 Company Knowledge Worker",
                 theme=gr.themes.Soft(),
-                css=self._get_custom_css_with_examples()
+                css=_CSS
             ) as interface:
                 
-                # Header
-                gr.Markdown("# 🏢 Company Knowledge Worker")
-                gr.Markdown(self._get_description())
+                # Header, description and example heading as one pre-rendered component
+                gr.HTML(_HEADER_HTML)
                 
-                # Persistent example questions at the top
-                gr.Markdown("## 💡 Quick Questions (Click to use):")
+                # Question box is created first so the examples above it can target it
+                msg = gr.Textbox(
+                    label="Your question",
+                    placeholder="Ask me anything about the company...",
+                    container=False,
+                    scale=7,
+                    render=False
+                )
                 
-                with gr.Row():
-                    with gr.Column(scale=1):
-                        example_buttons = []
-                        examples = self._get_examples()
-                        
-                        # Create buttons for first half of examples
-                        for i in range(0, len(examples), 2):
-                            if i < len(examples):
-                                btn = gr.Button(examples[i], size="sm", variant="secondary")
-                                example_buttons.append((btn, examples[i]))
-                    
-                    with gr.Column(scale=1):
-                        # Create buttons for second half of examples
-                        for i in range(1, len(examples), 2):
-                            if i < len(examples):
-                                btn = gr.Button(examples[i], size="sm", variant="secondary")
-                                example_buttons.append((btn, examples[i]))
+                # Persistent example questions at the top; clicking one fills the question box
+                gr.Examples(
+                    examples=[[example] for example in _EXAMPLES],
+                    inputs=msg,
+                    label=None,
+                    examples_per_page=len(_EXAMPLES)
+                )
                 
                 gr.Markdown("---")
                 
@@ -69,129 +268,65 @@ class ChatInterface:
                     height=400,
                     show_label=False,
                     container=True,
-                    bubble_full_width=False
+                    bubble_full_width=False,
+                    type="messages"
                 )
                 
-                msg = gr.Textbox(
-                    label="Your question",
-                    placeholder="Ask me anything about the company...",
-                    container=False,
-                    scale=7
-                )
+                msg.render()
                 
                 with gr.Row():
                     submit_btn = gr.Button("Send", variant="primary", scale=1)
                     clear_btn = gr.Button("Clear", variant="secondary", scale=1)
                 
+                # Per-browser session id; the history itself stays on the server
+                session = gr.State(lambda: uuid.uuid4().hex)
+                
                 # Chat functionality
-                def respond(message, history):
+                def respond(message, session_id):
+                    history = self._session_history(session_id)
                     if not message.strip():
-                        return history, ""
+                        yield history, ""
+                        return
                     
+                    history.append({"role": "user", "content": message})
+                    history.append({"role": "assistant", "content": ""})
                     try:
-                        result = self.rag_pipeline.ask_question(message)
-                        response = result["answer"]
-                        history.append([message, response])
-                        return history, ""
+                        for partial_answer in self._stream_answer(message):
+                            history[-1]["content"] = partial_answer
+                            yield history, ""
                     except Exception as e:
-                        logger.error(f"Chat function error: {e}")
-                        error_msg = f"Sorry, I encountered an error: {str(e)}"
-                        history.append([message, error_msg])
-                        return history, ""
+                        logger.error("Chat function error: %s", e)
+                        history[-1]["content"] = f"{_ERROR_PREFIX}: {str(e)}"
+                        yield history, ""
                 
-                def clear_conversation():
+                def clear_conversation(session_id):
+                    self._session_history(session_id).clear()
                     return [], ""
                 
                 # Event handlers
-                msg.submit(respond, [msg, chatbot], [chatbot, msg])
-                submit_btn.click(respond, [msg, chatbot], [chatbot, msg])
-                clear_btn.click(clear_conversation, None, [chatbot, msg])
-                
-                # Connect example buttons with proper closure handling
-                def create_example_handler(text):
-                    def handler():
-                        return text
-                    return handler
-                
-                for btn, example_text in example_buttons:
-                    btn.click(create_example_handler(example_text), None, msg, show_progress=False)
+                msg.submit(respond, [msg, session], [chatbot, msg], queue=True)
+                submit_btn.click(respond, [msg, session], [chatbot, msg], queue=True)
+                clear_btn.click(clear_conversation, session, [chatbot, msg], queue=False)
             
             self.interface = interface
             logger.info("Enhanced Gradio chat interface with persistent examples created successfully")
             return interface
             
         except Exception as e:
-            logger.error(f"Error creating enhanced Gradio interface: {e}")
+            logger.error("Error creating enhanced Gradio interface: %s", e)
             raise
     
     def _get_description(self) -> str:
         """Get the interface description"""
-        return """
-        Ask me anything about company documents, projects, invoices, contracts, and more! 
-        
-        **Enhanced with comprehensive project knowledge including:**
-        - SQL Server upgrades and database infrastructure
-        - Precision agriculture and asset management systems  
-        - Mining analytics and fleet management (SFMS)
-        - Database migration projects
-        - Advanced driver assistance systems (ADAS)
-        
-        **Document types covered:**
-        - Company documents and contracts
-        - Project documentation and specifications
-        - Financial records and invoices
-        - Technical documentation and scripts
-        """
+        return _DESCRIPTION
     
-    def _get_examples(self) -> List[str]:
+    def _get_examples(self) -> Tuple[str, ...]:
         """Get example questions for the interface"""
-        return [
-            "What projects is the company working on?",
-            "Tell me about the SQL Server upgrade project",
-            "What is the Precision Agriculture Asset Management project?",
-            "Describe the SFMS Mining Analytics project", 
-            "What database migration work is being done?",
-            "Tell me about the company's invoices and financial information",
-            "What contracts does the company have?",
-            "Summarize the company's business activities",
-            "What technical documentation is available?",
-            "Tell me about the Advanced Driver Assistance System project"
-        ]
+        return _EXAMPLES
     
     def _get_custom_css_with_examples(self) -> str:
         """Get custom CSS for the enhanced interface with persistent examples"""
-        return """
-        .gradio-container {
-            max-width: 1200px !important;
-        }
-        .chat-message {
-            font-size: 16px !important;
-        }
-        /* Style for example buttons */
-        button[variant="secondary"] {
-            margin: 2px !important;
-            padding: 8px 12px !important;
-            font-size: 13px !important;
-            line-height: 1.2 !important;
-            text-align: left !important;
-            white-space: normal !important;
-            word-wrap: break-word !important;
-            min-height: 45px !important;
-            max-height: 60px !important;
-        }
-        /* Ensure buttons expand to fill column width */
-        .gr-button {
-            width: 100% !important;
-        }
-        /* Style the header sections */
-        h1, h2 {
-            margin-bottom: 10px !important;
-        }
-        /* Chat container styling */
-        .chatbot {
-            border-radius: 8px !important;
-        }
-        """
+        return _CSS
     
     def launch(self, 
                server_name: str = "127.0.0.1", 
@@ -209,7 +344,8 @@ class ChatInterface:
             launch_kwargs = {
                 "server_name": server_name,
                 "share": share,
-                "inbrowser": inbrowser
+                "inbrowser": inbrowser,
+                "max_threads": config.GRADIO_MAX_THREADS
             }
             
             # Handle port selection more intelligently
@@ -218,11 +354,18 @@ class ChatInterface:
             # If no port specified, let Gradio find an available one
             # Don't set server_port at all to enable automatic port selection
             
-            logger.info(f"Launching enhanced Gradio interface with kwargs: {launch_kwargs}")
+            # Queue requests so concurrent users overlap LLM waits instead of
+            # tying up server threads
+            self.interface.queue(
+                default_concurrency_limit=config.GRADIO_CONCURRENCY,
+                max_size=config.GRADIO_QUEUE_SIZE
+            )
+            
+            logger.info("Launching enhanced Gradio interface with kwargs: %s", launch_kwargs)
             self.interface.launch(**launch_kwargs)
             
         except Exception as e:
-            logger.error(f"Error launching enhanced Gradio interface: {e}")
+            logger.error("Error launching enhanced Gradio interface: %s", e)
             raise
     
     def get_interface_info(self) -> dict:
@@ -231,9 +374,33 @@ class ChatInterface:
             "interface_created": self.interface is not None,
             "interface_type": "Enhanced with persistent examples",
             "rag_pipeline_ready": self.rag_pipeline.get_pipeline_status()["overall_ready"],
-            "examples_count": len(self._get_examples())
+            "examples_count": len(_EXAMPLES)
         }
 
+# Command-line chat text, written in one call each
+_CLI_BANNER = "\n".join([
+    "\\n" + "="*60,
+    "🏢 ARTILIGENCE KNOWLEDGE WORKER - SIMPLE CHAT",
+    "="*60,
+    "Type 'quit', 'exit', or 'q' to exit",
+    "Type 'help' for available commands",
+    "Ask me anything about your company documents!",
+    "="*60
+]) + "\n"
+
+_CLI_HELP = "\n".join([
+    "\\n📚 Available commands:",
+    "  • help    - Show this help message",
+    "  • status  - Show system status",
+    "  • clear   - Clear conversation history",
+    "  • quit    - Exit the application",
+    "\\n💡 You can ask questions about:",
+    "  • Company projects and documentation",
+    "  • Company contracts and invoices",
+    "  • Technical specifications and procedures",
+    "  • Financial information and records"
+]) + "\n"
+
 class SimpleChatInterface:
     """Simple command-line chat interface as fallback"""
     
@@ -242,31 +409,26 @@ class SimpleChatInterface:
     
     def run(self):
         """Run the simple command-line chat interface"""
-        print("\\n" + "="*60)
-        print("🏢 ARTILIGENCE KNOWLEDGE WORKER - SIMPLE CHAT")
-        print("="*60)
-        print("Type 'quit', 'exit', or 'q' to exit")
-        print("Type 'help' for available commands")
-        print("Ask me anything about your company documents!")
-        print("="*60)
+        sys.stdout.write(_CLI_BANNER)
         
         while True:
             try:
                 question = input("\\n❓ Your question: ")
+                command = question.casefold()
                 
-                if question.lower() in ['quit', 'exit', 'q']:
+                if command in ['quit', 'exit', 'q']:
                     print("👋 Goodbye!")
                     break
                 
-                if question.lower() == 'help':
+                if command == 'help':
                     self._show_help()
                     continue
                 
-                if question.lower() == 'status':
+                if command == 'status':
                     self._show_status()
                     continue
                 
-                if question.lower() == 'clear':
+                if command == 'clear':
                     self.rag_pipeline.clear_conversation_history()
                     print("🧹 Conversation history cleared!")
                     continue
@@ -276,12 +438,23 @@ class SimpleChatInterface:
                     
                 print("🤔 Thinking...")
                 
-                result = self.rag_pipeline.ask_question(question)
-                
-                if result["success"]:
-                    print(f"\\n💬 Answer: {result['answer']}")
+                ask_question_stream = getattr(self.rag_pipeline, "ask_question_stream", None)
+                if ask_question_stream is not None:
+                    # Print the answer as it is generated
+                    sys.stdout.write("\\n💬 Answer: ")
+                    printed = ""
+                    for answer in ask_question_stream(question):
+                        sys.stdout.write(answer[len(printed):])
+                        sys.stdout.flush()
+                        printed = answer
+                    print()
                 else:
-                    print(f"\\n❌ Error: {result.get('error', 'Unknown error')}")
+                    result = self.rag_pipeline.ask_question(question)
+                    
+                    if result["success"]:
+                        print(f"\\n💬 Answer: {result['answer']}")
+                    else:
+                        print(f"\\n❌ Error: {result.get('error', 'Unknown error')}")
                 
                 print("\\n" + "-"*60)
                 
@@ -290,38 +463,32 @@ class SimpleChatInterface:
                 break
             except Exception as e:
                 print(f"\\n❌ Unexpected error: {e}")
-                logger.error(f"Simple chat error: {e}")
+                logger.error("Simple chat error: %s", e)
     
     def _show_help(self):
         """Show help information"""
-        print("\\n📚 Available commands:")
-        print("  • help    - Show this help message")
-        print("  • status  - Show system status")
-        print("  • clear   - Clear conversation history")
-        print("  • quit    - Exit the application")
-        print("\\n💡 You can ask questions about:")
-        print("  • Company projects and documentation")
-        print("  • Company contracts and invoices")
-        print("  • Technical specifications and procedures")
-        print("  • Financial information and records")
+        sys.stdout.write(_CLI_HELP)
     
     def _show_status(self):
         """Show system status"""
         status = self.rag_pipeline.get_pipeline_status()
         vector_stats = status.get("vector_store_stats", {})
-        
-        print("\\n📊 System Status:")
-        print(f"  • RAG Pipeline Ready: {'✅' if status['overall_ready'] else '❌'}")
-        print(f"  • Vector Store: {'✅' if status['vector_store_available'] else '❌'}")
-        print(f"  • LLM Initialized: {'✅' if status['llm_initialized'] else '❌'}")
-        print(f"  • Memory Initialized: {'✅' if status['memory_initialized'] else '❌'}")
+    
+        lines = [
+            "\\n📊 System Status:",
+            f"  • RAG Pipeline Ready: {'✅' if status['overall_ready'] else '❌'}",
+            f"  • Vector Store: {'✅' if status['vector_store_available'] else '❌'}",
+            f"  • LLM Initialized: {'✅' if status['llm_initialized'] else '❌'}",
+            f"  • Memory Initialized: {'✅' if status['memory_initialized'] else '❌'}"
+        ]
         
         if vector_stats:
-            print(f"  • Total Documents: {vector_stats.get('total_documents', 'Unknown')}")
-            print(f"  • Embedding Dimensions: {vector_stats.get('embedding_dimensions', 'Unknown')}")
-            
+            lines.append(f"  • Total Documents: {vector_stats.get('total_documents', 'Unknown')}")
+            lines.append(f"  • Embedding Dimensions: {vector_stats.get('embedding_dimensions', 'Unknown')}")
+    
             doc_breakdown = vector_stats.get('doc_type_breakdown', {})
             if doc_breakdown:
-                print("  • Document Types:")
-                for doc_type, count in doc_breakdown.items():
-                    print(f"    - {doc_type}: {count}")
\ No newline at end of file
+                lines.append("  • Document Types:")
+                lines.extend(f"    - {doc_type}: {count}" for doc_type, count in doc_breakdown.items())
+    
+        sys.stdout.write("\n".join(lines) + "\n")
\ No newline at end of file
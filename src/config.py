@@ -3,44 +3,87 @@ Configuration management for Company Knowledge Worker
 """
 
 import os
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, ClassVar, Optional
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Load environment variables once, at import
+load_dotenv(override=True)
+
+_DEFAULT_CACHE_DIR = str(Path(__file__).parent.parent / 'cache')
+
+_SUPPORTED_EXTENSIONS = frozenset({
+    '.md', '.txt', '.py', '.js', '.html', '.css', '.json', '.yml', '.yaml',
+    '.xml', '.csv', '.rst', '.tex', '.pdf', '.docx', '.doc', '.xlsx', '.xls'
+})
+
+def _env(name: str, default: Optional[str], cast: Callable[[str], Any] = str):
+    """Dataclass field populated from an environment variable"""
+    def factory():
+        value = os.getenv(name, default)
+        return value if value is None else cast(value)
+    return field(default_factory=factory)
+
+def _env_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+@dataclass(frozen=True)
 class Config:
     """Application configuration"""
     
-    def __init__(self):
-        # Load environment variables
-        load_dotenv(override=True)
-        
-        # Model configuration
-        self.MODEL = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
-        self.OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-        
-        # Database configuration
-        self.DB_NAME = os.getenv('DB_NAME', 'vector_db')
-        
-        # Document processing configuration
-        self.BASE_PATH = os.getenv('BASE_PATH', '/path/to/company/documents')
-        self.MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', '100000'))  # 100KB
-        
-        # Chunking configuration
-        self.CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '1200'))
-        self.CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '150'))
-        
-        # Retrieval configuration  
-        self.RETRIEVAL_K = int(os.getenv('RETRIEVAL_K', '25'))  # Increased for better coverage
-        
-        # Gradio configuration
-        self.GRADIO_PORT = int(os.getenv('GRADIO_PORT', '7860'))
-        self.GRADIO_SHARE = os.getenv('GRADIO_SHARE', 'False').lower() == 'true'
-        
-        # Supported file extensions
-        self.SUPPORTED_EXTENSIONS = {
-            '.md', '.txt', '.py', '.js', '.html', '.css', '.json', '.yml', '.yaml', 
-            '.xml', '.csv', '.rst', '.tex', '.pdf', '.docx', '.doc', '.xlsx', '.xls'
-        }
-        
+    # Model configuration
+    MODEL: str = _env('OPENAI_MODEL', 'gpt-4-turbo-preview')
+    OPENAI_API_KEY: Optional[str] = _env('OPENAI_API_KEY', None)
+    
+    # Database configuration
+    DB_NAME: str = _env('DB_NAME', 'vector_db')
+    
+    # Document processing configuration
+    BASE_PATH: str = _env('BASE_PATH', '/path/to/company/documents')
+    MAX_FILE_SIZE: int = _env('MAX_FILE_SIZE', '100000', int)  # 100KB
+    LOADER_WORKERS: int = _env('LOADER_WORKERS', str(max(1, (os.cpu_count() or 2) - 1)), int)  # Loader processes
+    
+    # Chunking configuration
+    CHUNK_SIZE: int = _env('CHUNK_SIZE', '1200', int)
+    CHUNK_OVERLAP: int = _env('CHUNK_OVERLAP', '150', int)
+    FAST_SPLITTER: bool = _env('FAST_SPLITTER', 'False', _env_bool)  # Offset-based splitter instead of LangChain's
+    
+    # Embedding configuration
+    EMBED_MODEL: str = _env('EMBED_MODEL', 'text-embedding-ada-002')
+    EMBED_BATCH_SIZE: int = _env('EMBED_BATCH_SIZE', '128', int)  # Texts per embedding request
+    EMBED_CONCURRENCY: int = _env('EMBED_CONCURRENCY', '8', int)  # Embedding requests in flight
+    QUERY_BATCH_SIZE: int = _env('QUERY_BATCH_SIZE', '8', int)  # Concurrent queries per embedding request
+    QUERY_BATCH_WAIT_MS: int = _env('QUERY_BATCH_WAIT_MS', '20', int)  # Wait for queries to coalesce
+    
+    # Retrieval configuration
+    RETRIEVAL_K: int = _env('RETRIEVAL_K', '25', int)  # Increased for better coverage
+    
+    # Conversation memory configuration
+    MEMORY_TOKEN_LIMIT: int = _env('MEMORY_TOKEN_LIMIT', '1500', int)  # Recent history kept verbatim before summarizing
+    
+    # HNSW index configuration, applied when a collection is created
+    HNSW_M: int = _env('HNSW_M', '32', int)  # Graph links per node
+    HNSW_EF_CONSTRUCTION: int = _env('HNSW_EF_CONSTRUCTION', '256', int)  # Build-time candidate list
+    HNSW_EF_SEARCH: int = _env('HNSW_EF_SEARCH', '128', int)  # Query-time candidate list (at least 4x RETRIEVAL_K)
+    
+    # Cache configuration
+    CACHE_DIR: str = _env('CACHE_DIR', _DEFAULT_CACHE_DIR)
+    EMBED_CACHE_DIR: str = _env('EMBED_CACHE_DIR', os.path.join(os.getenv('CACHE_DIR', _DEFAULT_CACHE_DIR), 'embeddings'))
+    SEMANTIC_CACHE_THRESHOLD: float = _env('SEMANTIC_CACHE_THRESHOLD', '0.95', float)
+    
+    # Gradio configuration
+    GRADIO_PORT: int = _env('GRADIO_PORT', '7860', int)
+    GRADIO_SHARE: bool = _env('GRADIO_SHARE', 'False', _env_bool)
+    GRADIO_CONCURRENCY: int = _env('GRADIO_CONCURRENCY', '4', int)  # Questions answered at once
+    GRADIO_QUEUE_SIZE: int = _env('GRADIO_QUEUE_SIZE', '64', int)  # Pending requests before rejecting
+    GRADIO_MAX_THREADS: int = _env('GRADIO_MAX_THREADS', '40', int)  # Server worker threads
+    
+    # Supported file extensions (shared, not a per-instance field)
+    SUPPORTED_EXTENSIONS: ClassVar[frozenset] = _SUPPORTED_EXTENSIONS
+    
+    def __post_init__(self):
         # Validate required settings
         self._validate_config()
     
@@ -49,20 +92,50 @@ class Config:
         if not self.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        if not os.path.exists(self.BASE_PATH):
+        if not Path(self.BASE_PATH).exists():
             raise ValueError(f"BASE_PATH '{self.BASE_PATH}' does not exist")
     
+    @cached_property
+    def _http_client(self):
+        """Shared HTTP client for OpenAI requests, created on first use"""
+        import httpx
+        from importlib.util import find_spec
+        return httpx.Client(
+            http2=find_spec('h2') is not None,  # HTTP/2 needs the optional h2 package
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=300),
+            timeout=60.0
+        )
+    
+    def get_http_client(self):
+        """Get the shared connection-pooled HTTP client for OpenAI requests"""
+        return self._http_client
+    
+    @cached_property
+    def project_root(self) -> Path:
+        """Project root directory, resolved once"""
+        return Path(__file__).parent.parent
+    
+    @cached_property
+    def data_dir(self) -> Path:
+        """Data directory, resolved once"""
+        return self.project_root / 'data'
+    
+    @cached_property
+    def vector_db_path(self) -> str:
+        """Vector database path, resolved once"""
+        return str(self.project_root / self.DB_NAME)
+    
     def get_project_root(self) -> Path:
         """Get the project root directory"""
-        return Path(__file__).parent.parent
+        return self.project_root
     
     def get_data_dir(self) -> Path:
         """Get the data directory"""
-        return self.get_project_root() / 'data'
+        return self.data_dir
     
     def get_vector_db_path(self) -> str:
         """Get the vector database path"""
-        return str(self.get_project_root() / self.DB_NAME)
+        return self.vector_db_path
 
 # Global configuration instance
-config = Config()
\ No newline at end of file
+config = Config()
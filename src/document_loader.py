@@ -3,22 +3,100 @@ Document loading and processing module for Company Knowledge Worker
 """
 
 import os
-import glob
+import re
+import sys
+import mmap
+import stat
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice, repeat
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterable, Iterator, List, Dict, Any, NamedTuple, Optional, Tuple
 import logging
 
+import openpyxl
 import pandas as pd
 import docx2txt
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+from langchain_community.document_loaders import DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 
+try:
+    import pymupdf  # Optional: much faster PDF text extraction
+except ImportError:
+    pymupdf = None
+
+try:
+    import charset_normalizer  # Optional: encoding detection for non-UTF-8 text
+except ImportError:
+    charset_normalizer = None
+
 from .config import config
+from .loader_cache import LoaderCache
 
 logger = logging.getLogger(__name__)
 
+# Documents handed to the text splitter at a time
+CHUNK_BATCH_SIZE = 64
+
+# Extensions handled by each loader branch
+_TEXT_EXTS = frozenset({'.md', '.txt', '.py', '.js', '.html', '.css', '.json', '.yml', '.yaml', '.xml', '.csv', '.rst', '.tex'})
+_WORD_EXTS = frozenset({'.docx', '.doc'})
+_EXCEL_EXTS = frozenset({'.xlsx', '.xls'})
+_SPREADSHEET_EXTS = _EXCEL_EXTS | {'.csv'}
+
+# Text files larger than this are decoded from a memory map
+MMAP_THRESHOLD = 1 << 20
+
+# Split points in priority order
+SPLIT_SEPARATORS = ("\\n\\n", "\\n", " ", "")
+
+# Bump when loader output changes, so cached documents are not reused
+LOADER_CACHE_VERSION = 2
+
+# Upper bound on chunks indexed; larger corpora are uniformly sampled
+MAX_CHUNKS = 5000
+
+# Directory names that never contain company documents
+SKIPPED_DIRECTORIES = frozenset({'__pycache__', 'node_modules'})
+
+# Enhanced pattern matching for better classification, in priority order
+_PATH_KEYWORDS = (
+    ("SQL Server Upgrades", ('aa_sql', 'sql_server', 'sql server', 'version_upgrade', 'cumulative', 'aiskoldb', 'aiscengdb')),
+    ("Precision Agriculture Asset Management", ('itgisworx', 'precision', 'agriculture', 'sensaas', 'asset_management', 'assets_datastructure')),
+    ("SFMS Mining Analytics", ('aa_sfms', 'sfms', 'mining', 'quellaveco', 'amps', 'operator', 'hexagon', 'realtime', 'truck')),
+    ("Database Migration", ('eben_db_migration', 'migration', 'consolidated', 'modem', 'meters', 'suppliers', 'accounts', 'tariffs')),
+    ("Advanced Driver Assistance System", ('aa adas', 'adas', 'mix integrate', 'driver assistance', 'events', 'dictionary')),
+)
+
+# Same matching applied to a single folder name
+_FOLDER_KEYWORDS = (
+    ("SQL Server Upgrades", ('sql', 'server', 'upgrade')),
+    ("Precision Agriculture Asset Management", ('precision', 'agriculture', 'gis')),
+    ("SFMS Mining Analytics", ('sfms', 'mining', 'analytics')),
+    ("Database Migration", ('migration', 'db')),
+    ("Advanced Driver Assistance System", ('adas', 'driver')),
+)
+
+def _keyword_patterns(groups):
+    """Compile each group's keywords into one case-insensitive alternation"""
+    return tuple(
+        (project, re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE))
+        for project, keywords in groups
+    )
+
+_PATH_PATTERNS = _keyword_patterns(_PATH_KEYWORDS)
+_FOLDER_PATTERNS = _keyword_patterns(_FOLDER_KEYWORDS)
+
+class WalkedFile(NamedTuple):
+    """A file found by the directory walk, with the stat fields the loaders need"""
+    path: str
+    size: Optional[int]
+    mtime_ns: Optional[int]
+
 class DocumentProcessor:
     """Handles document loading and processing"""
     
@@ -27,36 +105,77 @@ class DocumentProcessor:
         self.max_file_size = config.MAX_FILE_SIZE
         self.base_path = config.BASE_PATH
         
+    def _scandir_recursive(self, path: str) -> Iterator[os.DirEntry]:
+        """Yield non-hidden entries under path depth-first, reusing scandir's cached file types"""
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except PermissionError as e:
+            logger.warning(f"Permission denied reading directory {path}: {e}")
+            return
+        
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            yield entry
+            # Skip common non-document directories; symlinked directories are not followed (as with os.walk)
+            if entry.is_dir(follow_symlinks=False) and entry.name.lower() not in SKIPPED_DIRECTORIES:
+                yield from self._scandir_recursive(entry.path)
+    
     def find_all_directories(self, base_path: str) -> List[str]:
         """Recursively find all directories under base_path"""
         directories = []
         try:
-            for root, dirs, files in os.walk(base_path):
-                # Skip hidden directories and common non-document directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d.lower() not in ['__pycache__', 'node_modules']]
-                if root != base_path:  # Skip the base directory itself
-                    directories.append(root)
+            for entry in self._scandir_recursive(base_path):
+                if entry.is_dir(follow_symlinks=False) and entry.name.lower() not in SKIPPED_DIRECTORIES:
+                    directories.append(entry.path)
         except Exception as e:
             logger.error(f"Error walking directory {base_path}: {e}")
         return directories
 
-    def find_all_files_recursive(self, base_path: str) -> List[str]:
-        """Recursively find all supported files"""
+    def _walk_files(self, base_path: str) -> Iterator[WalkedFile]:
+        """Yield every non-hidden regular file under base_path, with its size and mtime"""
+        if not hasattr(os, 'fwalk'):
+            # No fd-relative filesystem calls (e.g. Windows): use the scandir walk
+            for entry in self._scandir_recursive(base_path):
+                if entry.is_file():
+                    yield _walked_entry(entry)
+            return
+        
+        def on_error(error: OSError):
+            logger.warning(f"Could not read directory {error.filename}: {error}")
+        
+        # fwalk keeps each directory open, so stats come from stat-at-fd calls
+        # rather than resolving every full path again
+        for root, dirs, files, dirfd in os.fwalk(base_path, onerror=on_error):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d.lower() not in SKIPPED_DIRECTORIES]
+            for name in files:
+                if name.startswith('.'):
+                    continue
+                try:
+                    file_stat = os.stat(name, dir_fd=dirfd)
+                except OSError:
+                    continue
+                if stat.S_ISREG(file_stat.st_mode):
+                    yield WalkedFile(os.path.join(root, name), file_stat.st_size, file_stat.st_mtime_ns)
+
+    def find_supported_files(self, base_path: str) -> List[WalkedFile]:
+        """Recursively find all supported files, with their sizes and mtimes"""
         files = []
         try:
-            for root, dirs, filenames in os.walk(base_path):
-                # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for filename in filenames:
-                    if not filename.startswith('.'):  # Skip hidden files
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        if file_ext in self.supported_extensions:
-                            files.append(os.path.join(root, filename))
+            for file in self._walk_files(base_path):
+                if _file_ext(file.path) in self.supported_extensions:
+                    files.append(file)
         except Exception as e:
             logger.error(f"Error walking directory {base_path}: {e}")
         return files
 
-    def get_document_type(self, file_path: str, base_path: str) -> str:
+    def find_all_files_recursive(self, base_path: str) -> List[str]:
+        """Recursively find all supported files"""
+        return [file.path for file in self.find_supported_files(base_path)]
+
+    @staticmethod
+    def get_document_type(file_path: str, base_path: str) -> str:
         """Determine document type based on directory structure"""
         rel_path = os.path.relpath(file_path, base_path)
         path_parts = rel_path.split(os.sep)
@@ -67,7 +186,8 @@ class DocumentProcessor:
             # Use the top-level directory as the document type
             return path_parts[0]
 
-    def add_metadata(self, doc: Document, doc_type: str, file_type: str = None, subdirectory: str = None) -> Document:
+    @staticmethod
+    def add_metadata(doc: Document, doc_type: str, file_type: str = None, subdirectory: str = None) -> Document:
         """Add comprehensive metadata to documents"""
         doc.metadata["doc_type"] = doc_type
         if file_type:
@@ -76,308 +196,669 @@ class DocumentProcessor:
             doc.metadata["subdirectory"] = subdirectory
         return doc
 
-    def load_documents_recursive(self) -> List[Document]:
+    def load_documents_recursive(self, max_workers: Optional[int] = None,
+                                 files: Optional[List[WalkedFile]] = None) -> List[Document]:
         """Recursively load all supported documents from nested directory structure"""
-        documents = []
+        return list(self._iter_documents(max_workers, files))
+
+    def _iter_documents(self, max_workers: Optional[int] = None,
+                        files: Optional[List[WalkedFile]] = None) -> Iterator[Document]:
+        """Yield supported documents in file order as the loader processes produce them"""
+        if max_workers is None:
+            max_workers = config.LOADER_WORKERS
+        
+        # Find all supported files recursively, with their sizes, unless already walked
+        if files is None:
+            files = self.find_supported_files(self.base_path)
         
-        # Find all supported files recursively
-        all_files = self.find_all_files_recursive(self.base_path)
+        # Reuse documents for files unchanged since they were last loaded
+        cache = _open_loader_cache(f"documents:v{LOADER_CACHE_VERSION}:{self.base_path}")
+        cached = _cache_lookup(cache, [f for f in files if f.size is None or f.size <= self.max_file_size])
+        to_load = [f for f in files if f.path not in cached]
         
-        logger.info(f"Processing {len(all_files)} files...")
+        logger.info(f"Processing {len(files)} files ({len(cached)} cached) with {max_workers} workers...")
         
         loaded_count = 0
         skipped_large = 0
         skipped_errors = 0
+        newly_loaded = []
         
-        for file_path in all_files:
-            try:
-                # Check file size first
-                file_size = os.path.getsize(file_path)
-                if file_size > self.max_file_size:
-                    skipped_large += 1
-                    continue
-                    
-                file_ext = os.path.splitext(file_path)[1].lower()
-                filename = os.path.basename(file_path)
-                doc_type = self.get_document_type(file_path, self.base_path)
-                
-                # Get subdirectory for metadata
-                rel_path = os.path.relpath(file_path, self.base_path)
-                subdirectory = os.path.dirname(rel_path) if os.path.dirname(rel_path) != '.' else None
+        # Parse files in worker processes so PDF/Word/Excel parsing is not bound by the GIL;
+        # map keeps results in file order, and chunksize amortises the pickling overhead
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _load_one, [f.path for f in to_load], [f.size for f in to_load],
+                repeat(self.base_path), repeat(self.max_file_size), self._next_paths(to_load),
+                chunksize=8
+            )
+            for file in files:
+                if file.path in cached:
+                    file_docs, status = cached[file.path], "loaded"
+                else:
+                    file_docs, status = next(results)
+                    if status == "loaded":
+                        newly_loaded.append((file, file_docs))
                 
-                # Load based on file type
-                if file_ext in ['.md', '.txt', '.py', '.js', '.html', '.css', '.json', '.yml', '.yaml', '.xml', '.csv', '.rst', '.tex']:
-                    try:
-                        loader = TextLoader(file_path, encoding='utf-8')
-                        doc = loader.load()[0]
-                        documents.append(self.add_metadata(doc, doc_type, file_ext[1:], subdirectory))
-                        loaded_count += 1
-                    except UnicodeDecodeError:
-                        # Try with different encoding
-                        try:
-                            loader = TextLoader(file_path, encoding='latin-1')
-                            doc = loader.load()[0]
-                            documents.append(self.add_metadata(doc, doc_type, file_ext[1:], subdirectory))
-                            loaded_count += 1
-                        except Exception as e:
-                            logger.warning(f"Could not load {filename}: {e}")
-                            skipped_errors += 1
-                            
-                elif file_ext == '.pdf':
-                    try:
-                        loader = PyPDFLoader(file_path)
-                        pdf_docs = loader.load()
-                        for pdf_doc in pdf_docs:
-                            documents.append(self.add_metadata(pdf_doc, doc_type, "pdf", subdirectory))
-                        loaded_count += len(pdf_docs)
-                    except Exception as e:
-                        logger.warning(f"Could not load PDF {filename}: {e}")
-                        skipped_errors += 1
-                        
-                elif file_ext in ['.docx', '.doc']:
-                    try:
-                        loader = Docx2txtLoader(file_path)
-                        doc = loader.load()[0]
-                        documents.append(self.add_metadata(doc, doc_type, "docx", subdirectory))
-                        loaded_count += 1
-                    except Exception as e:
-                        logger.warning(f"Could not load Word file {filename}: {e}")
-                        skipped_errors += 1
-                        
-                elif file_ext in ['.xlsx', '.xls']:
-                    try:
-                        excel_file = pd.ExcelFile(file_path)
-                        content_parts = []
-                        
-                        for sheet_name in excel_file.sheet_names:
-                            df = pd.read_excel(file_path, sheet_name=sheet_name)
-                            sheet_content = f"Sheet: {sheet_name}\\n"
-                            sheet_content += f"Shape: {df.shape[0]} rows, {df.shape[1]} columns\\n"
-                            sheet_content += f"Columns: {', '.join(df.columns.astype(str))}\\n\\n"
-                            df_sample = df.head(100)
-                            sheet_content += df_sample.to_string(index=False)
-                            content_parts.append(sheet_content)
-                        
-                        combined_content = f"Excel File: {filename}\\n\\n" + "\\n\\n---\\n\\n".join(content_parts)
-                        doc = Document(page_content=combined_content, metadata={"source": file_path})
-                        documents.append(self.add_metadata(doc, doc_type, "excel", subdirectory))
-                        loaded_count += 1
-                    except Exception as e:
-                        logger.warning(f"Could not load Excel file {filename}: {e}")
-                        skipped_errors += 1
-                        
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {e}")
-                skipped_errors += 1
+                if status == "too_large":
+                    skipped_large += 1
+                elif status == "error":
+                    skipped_errors += 1
+                else:
+                    loaded_count += len(file_docs)
+                    yield from file_docs
         
         logger.info(f"Loading Summary: {loaded_count} documents loaded, {skipped_large} skipped (too large), {skipped_errors} skipped (errors)")
-        
-        return documents
+        _cache_store(cache, newly_loaded)
+
+    def _next_paths(self, files: List[WalkedFile]) -> List[Optional[str]]:
+        """For each file, the following file worth prefetching (skipping ones too large to load)"""
+        loadable = [
+            file.path if file.size is None or file.size <= self.max_file_size else None
+            for file in files
+        ]
+        return loadable[1:] + [None]
 
-    def determine_project_name(self, file_path: str) -> str:
+    @staticmethod
+    def determine_project_name(file_path: str) -> str:
         """Determine project name from file path with improved classification"""
-        file_path_lower = file_path.lower()
-        filename = os.path.basename(file_path).lower()
-        
-        # Enhanced pattern matching for better classification
-        if any(keyword in file_path_lower for keyword in ['aa_sql', 'sql_server', 'sql server', 'version_upgrade', 'cumulative', 'aiskoldb', 'aiscengdb']):
-            return "SQL Server Upgrades"
-        elif any(keyword in file_path_lower for keyword in ['itgisworx', 'precision', 'agriculture', 'sensaas', 'asset_management', 'assets_datastructure']):
-            return "Precision Agriculture Asset Management"
-        elif any(keyword in file_path_lower for keyword in ['aa_sfms', 'sfms', 'mining', 'quellaveco', 'amps', 'operator', 'hexagon', 'realtime', 'truck']):
-            return "SFMS Mining Analytics"
-        elif any(keyword in file_path_lower for keyword in ['eben_db_migration', 'migration', 'consolidated', 'modem', 'meters', 'suppliers', 'accounts', 'tariffs']):
-            return "Database Migration"
-        elif any(keyword in file_path_lower for keyword in ['aa adas', 'adas', 'mix integrate', 'driver assistance', 'events', 'dictionary']):
-            return "Advanced Driver Assistance System"
-        else:
-            # Extract folder name as project for other directories
-            path_parts = file_path.split('/')
-            for part in reversed(path_parts):
-                if part != os.path.basename(file_path) and part != 'Projects':
-                    # Apply same enhanced matching to folder names
-                    part_lower = part.lower()
-                    if any(keyword in part_lower for keyword in ['sql', 'server', 'upgrade']):
-                        return "SQL Server Upgrades"
-                    elif any(keyword in part_lower for keyword in ['precision', 'agriculture', 'gis']):
-                        return "Precision Agriculture Asset Management"
-                    elif any(keyword in part_lower for keyword in ['sfms', 'mining', 'analytics']):
-                        return "SFMS Mining Analytics"
-                    elif any(keyword in part_lower for keyword in ['migration', 'db']):
-                        return "Database Migration"
-                    elif any(keyword in part_lower for keyword in ['adas', 'driver']):
-                        return "Advanced Driver Assistance System"
-                    else:
-                        return part.replace('_', ' ').title()
-        return "General Project"
-
-    def load_enhanced_project_documents(self) -> List[Document]:
+        dir_path, filename = os.path.split(file_path)
+        # Keywords never contain a path separator, so a full-path match is a match
+        # on either the (cached) directory or the filename, checked in priority order
+        dir_project, folder_project = _classify_dir(dir_path)
+        for project, pattern in _PATH_PATTERNS:
+            if project == dir_project or pattern.search(filename):
+                return project
+        return folder_project
+
+    def load_enhanced_project_documents(self, max_workers: Optional[int] = None,
+                                        project_files: Optional[List[WalkedFile]] = None) -> List[Document]:
         """Load project documents with enhanced context and processing"""
+        return list(self._iter_project_documents(max_workers, project_files))
+
+    def _iter_project_documents(self, max_workers: Optional[int] = None,
+                                project_files: Optional[List[WalkedFile]] = None) -> Iterator[Document]:
+        """Yield enhanced project documents in file order as the loader processes produce them"""
+        if max_workers is None:
+            max_workers = config.LOADER_WORKERS
+        
         logger.info("Loading company project documents with enhanced context...")
         
-        # Get all project files specifically
-        project_files = glob.glob(os.path.join(self.base_path, "Projects/**/*"), recursive=True)
-        project_files = [f for f in project_files if os.path.isfile(f)]
+        # Get all project files specifically, unless already walked
+        if project_files is None:
+            project_files = list(self._walk_files(os.path.join(self.base_path, "Projects")))
         
-        logger.info(f"Found {len(project_files)} project files")
+        # Reuse documents for files unchanged since they were last loaded
+        cache = _open_loader_cache(f"projects:v{LOADER_CACHE_VERSION}")
+        cached = _cache_lookup(cache, project_files)
+        to_load = [f.path for f in project_files if f.path not in cached]
         
-        documents = []
+        logger.info(f"Found {len(project_files)} project files ({len(cached)} cached)")
         
-        for file_path in project_files:
-            try:
-                filename = os.path.basename(file_path)
-                file_ext = os.path.splitext(filename)[1].lower()
-                project_name = self.determine_project_name(file_path)
-                
-                # Skip temporary files
-                if filename.startswith('~$') or filename.startswith('.'):
-                    continue
-                    
-                logger.debug(f"Processing: {filename} (Project: {project_name})")
-                
-                # Enhanced metadata function
-                def add_enhanced_metadata(doc, doc_type, file_type, project_name):
-                    doc.metadata["doc_type"] = doc_type
-                    doc.metadata["file_type"] = file_type
-                    doc.metadata["company"] = "Company"
-                    doc.metadata["project"] = project_name
-                    return doc
+        loaded_count = 0
+        projects = {}
+        newly_loaded = []
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            next_paths = to_load[1:] + [None]
+            results = executor.map(_load_project_file, to_load, next_paths, chunksize=8)
+            for file in project_files:
+                if file.path in cached:
+                    file_docs = cached[file.path]
+                else:
+                    file_docs = next(results)
+                    # Empty results may be read errors, so they are retried next time
+                    if file_docs:
+                        newly_loaded.append((file, file_docs))
                 
-                # Load different file types with enhanced context
-                if file_ext == '.pdf':
-                    try:
-                        loader = PyPDFLoader(file_path)
-                        docs = loader.load()
-                        for doc in docs:
-                            # Add company context to the document content
-                            enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nDocument: {filename}\\n\\n{doc.page_content}"
-                            doc.page_content = enhanced_content
-                            documents.append(add_enhanced_metadata(doc, "Projects", "pdf", project_name))
-                    except Exception as e:
-                        logger.warning(f"Could not read PDF {filename}: {e}")
-                        
-                elif file_ext in ['.docx', '.doc']:
-                    try:
-                        content = docx2txt.process(file_path)
-                        if content.strip():
-                            enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nDocument: {filename}\\n\\n{content}"
-                            doc = Document(page_content=enhanced_content, metadata={"source": file_path})
-                            documents.append(add_enhanced_metadata(doc, "Projects", "docx", project_name))
-                    except Exception as e:
-                        logger.warning(f"Could not read Word doc {filename}: {e}")
-                        
-                elif file_ext == '.txt':
-                    try:
-                        encodings = ['utf-8', 'latin-1', 'cp1252']
-                        content = None
-                        for encoding in encodings:
-                            try:
-                                with open(file_path, 'r', encoding=encoding) as f:
-                                    content = f.read()
-                                break
-                            except UnicodeDecodeError:
-                                continue
-                        
-                        if content:
-                            enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nScript/Document: {filename}\\n\\n{content}"
-                            doc = Document(page_content=enhanced_content, metadata={"source": file_path})
-                            documents.append(add_enhanced_metadata(doc, "Projects", "text", project_name))
-                    except Exception as e:
-                        logger.warning(f"Could not read text file {filename}: {e}")
-                        
-                elif file_ext in ['.sql']:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nSQL Script: {filename}\\n\\n{content}"
-                        doc = Document(page_content=enhanced_content, metadata={"source": file_path})
-                        documents.append(add_enhanced_metadata(doc, "Projects", "sql", project_name))
-                    except Exception as e:
-                        logger.warning(f"Could not read SQL file {filename}: {e}")
-                        
-                elif file_ext in ['.xlsx', '.xls', '.csv']:
-                    try:
-                        if file_ext == '.csv':
-                            df = pd.read_csv(file_path)
-                        else:
-                            df = pd.read_excel(file_path)
-                        
-                        # Create a summary of the spreadsheet
-                        summary = f"Spreadsheet with {len(df)} rows and {len(df.columns)} columns\\n"
-                        summary += f"Columns: {', '.join(df.columns.tolist())}\\n"
-                        summary += f"Sample data:\\n{df.head().to_string()}"
-                        
-                        enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nSpreadsheet: {filename}\\n\\n{summary}"
-                        doc = Document(page_content=enhanced_content, metadata={"source": file_path})
-                        documents.append(add_enhanced_metadata(doc, "Projects", "spreadsheet", project_name))
-                    except Exception as e:
-                        logger.warning(f"Could not read spreadsheet {filename}: {e}")
-                        
-            except Exception as e:
-                logger.warning(f"Could not process {filename}: {e}")
+                for doc in file_docs:
+                    project = doc.metadata.get('project', 'Unknown')
+                    projects[project] = projects.get(project, 0) + 1
+                    loaded_count += 1
+                    yield doc
         
-        logger.info(f"Loaded {len(documents)} enhanced project documents")
+        logger.info(f"Loaded {loaded_count} enhanced project documents")
         
         # Show project breakdown
-        projects = {}
-        for doc in documents:
-            project = doc.metadata.get('project', 'Unknown')
-            projects[project] = projects.get(project, 0) + 1
-        
         logger.info(f"Project breakdown: {projects}")
+        _cache_store(cache, newly_loaded)
+
+    def _iter_chunk_batches(self, documents: Iterable[Document],
+                            max_workers: Optional[int] = None) -> Iterator[Tuple[int, List[Document]]]:
+        """Split documents in worker processes, yielding (documents in batch, chunks) in input order
+        
+        Chunks come back unpickled with private copies of every metadata string, so keys and
+        values are interned to share one object per distinct string across all chunks.
+        """
+        if max_workers is None:
+            max_workers = config.LOADER_WORKERS
         
-        return documents
+        # Bound the batches in flight so documents are not all pulled into memory at once
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while batch := list(islice(documents, CHUNK_BATCH_SIZE)):
+                pending.append((len(batch), executor.submit(_chunk_batch, batch)))
+                if len(pending) >= max_workers * 2:
+                    batch_size, future = pending.popleft()
+                    yield batch_size, _intern_metadata(future.result())
+            while pending:
+                batch_size, future = pending.popleft()
+                yield batch_size, _intern_metadata(future.result())
 
-    def chunk_documents(self, documents: List[Document]) -> List[Document]:
+    def chunk_documents(self, documents: List[Document], max_workers: Optional[int] = None) -> List[Document]:
         """Chunk documents using RecursiveCharacterTextSplitter"""
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.CHUNK_SIZE,
-            chunk_overlap=config.CHUNK_OVERLAP,
-            length_function=len,
-            separators=["\\n\\n", "\\n", " ", ""]
-        )
-        
-        chunks = text_splitter.split_documents(documents)
+        chunks = [
+            chunk
+            for _, batch_chunks in self._iter_chunk_batches(iter(documents), max_workers)
+            for chunk in batch_chunks
+        ]
         logger.info(f"Created {len(chunks)} document chunks")
         
         return chunks
 
-    def load_all_documents(self) -> List[Document]:
-        """Load all documents (standard + enhanced projects) and chunk them"""
+    def _iter_project_documents_safely(self, max_workers: Optional[int] = None,
+                                       project_files: Optional[List[WalkedFile]] = None) -> Iterator[Document]:
+        """Yield enhanced project documents, logging rather than raising on failure"""
+        count = 0
+        try:
+            for doc in self._iter_project_documents(max_workers=max_workers, project_files=project_files):
+                count += 1
+                yield doc
+            logger.info(f"Added {count} enhanced project documents")
+        except Exception as e:
+            logger.error(f"Could not load enhanced project documents: {e}")
+
+    def find_corpus_files(self) -> List[WalkedFile]:
+        """Walk the document tree once, for load_all_documents and vector store change detection"""
+        return list(self._walk_files(self.base_path))
+
+    def load_all_documents(self, max_workers: Optional[int] = None,
+                           files: Optional[List[WalkedFile]] = None) -> List[Document]:
+        """Load all documents (standard + enhanced projects) and chunk them
+        
+        files, from find_corpus_files, limits loading to those files (e.g. only the changed ones).
+        """
         logger.info("Starting comprehensive document loading...")
         
-        # Load standard documents
-        documents = self.load_documents_recursive()
+        # Walk the tree once and share it between both loaders
+        all_files = self.find_corpus_files() if files is None else files
+        projects_prefix = os.path.join(self.base_path, "Projects") + os.sep
+        supported_files = [f for f in all_files if _file_ext(f.path) in self.supported_extensions]
+        project_files = [f for f in all_files if f.path.startswith(projects_prefix)]
+        
+        # Stream standard then enhanced project documents
+        documents = chain(
+            self._iter_documents(max_workers=max_workers, files=supported_files),
+            self._iter_project_documents_safely(max_workers=max_workers, project_files=project_files)
+        )
+        
+        # Filter large documents (except projects), keeping all project documents regardless of size
+        filtered_docs = (
+            doc for doc in documents
+            if doc.metadata.get('doc_type', 'unknown') == 'Projects' or len(doc.page_content) <= self.max_file_size
+        )
+        
+        # Chunk the documents in small batches across processes so only chunks, not raw documents, are held.
+        # Safety check - limit chunks if too many, by reservoir sampling as they are created
+        rng = random.Random(42)
+        chunks = []
+        chunk_count = 0
+        filtered_count = 0
+        for batch_size, batch_chunks in self._iter_chunk_batches(filtered_docs, max_workers):
+            filtered_count += batch_size
+            for chunk in batch_chunks:
+                chunk_count += 1
+                if len(chunks) < MAX_CHUNKS:
+                    chunks.append(chunk)
+                else:
+                    j = rng.randrange(chunk_count)
+                    if j < MAX_CHUNKS:
+                        chunks[j] = chunk
+        
+        logger.info(f"Using {filtered_count} documents after filtering")
+        logger.info(f"Created {chunk_count} document chunks")
         
-        # Load enhanced project documents
+        if chunk_count > MAX_CHUNKS:
+            logger.warning(f"Too many chunks ({chunk_count}). Sampled {MAX_CHUNKS} representative chunks.")
+        
+        logger.info(f"Document processing completed - Total: {len(chunks)} chunks")
+        return chunks
+
+@lru_cache(maxsize=None)
+def _text_splitter() -> RecursiveCharacterTextSplitter:
+    """Text splitter configured for this corpus, built once per process"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=config.CHUNK_SIZE,
+        chunk_overlap=config.CHUNK_OVERLAP,
+        length_function=len,
+        separators=list(SPLIT_SEPARATORS)
+    )
+
+def fast_recursive_split(text: str, chunk_size: int, chunk_overlap: int,
+                         separators: Tuple[str, ...] = SPLIT_SEPARATORS) -> List[str]:
+    """Split text by offsets, cutting at the highest-priority separator near each chunk boundary
+    
+    Separators are only searched for in the last chunk_overlap characters before the boundary,
+    so each chunk is sliced from the text once instead of being rebuilt from recursive pieces.
+    """
+    chunks = []
+    start, length = 0, len(text)
+    while start < length:
+        end = start + chunk_size
+        if end >= length:
+            split = next_start = length
+        else:
+            # No separator near the boundary: hard split at chunk_size
+            split = next_start = end
+            window_start = max(end - chunk_overlap, start + 1)
+            for separator in separators:
+                if not separator:
+                    break
+                position = text.rfind(separator, window_start, end)
+                if position != -1:
+                    split, next_start = position, position + len(separator)
+                    break
+        
+        chunk = text[start:split].strip()
+        if chunk:
+            chunks.append(chunk)
+        if next_start >= length:
+            break
+        
+        # Step back by the overlap, starting the next chunk on a word boundary when possible
+        overlap_start = max(next_start - chunk_overlap, start + 1)
+        space = text.find(' ', overlap_start, next_start)
+        start = space + 1 if space != -1 else overlap_start
+    return chunks
+
+def _fast_split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents with fast_recursive_split, copying metadata to each chunk"""
+    return [
+        Document(page_content=chunk, metadata=doc.metadata.copy())
+        for doc in documents
+        for chunk in fast_recursive_split(doc.page_content, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    ]
+
+def _intern_metadata(documents: List[Document]) -> List[Document]:
+    """Replace metadata keys and string values with their interned copies"""
+    for doc in documents:
+        doc.metadata = {
+            sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+            for key, value in doc.metadata.items()
+        }
+    return documents
+
+def _chunk_batch(batch: List[Document]) -> List[Document]:
+    """Split a batch of documents (module-level so it can run in ProcessPoolExecutor workers)"""
+    if config.FAST_SPLITTER:
+        return _fast_split_documents(batch)
+    return _text_splitter().split_documents(batch)
+
+def _file_ext(file_path: str) -> str:
+    """Lowercased extension including the dot (as os.path.splitext), using plain string ops"""
+    filename = file_path.rpartition(os.sep)[2]
+    stem, dot, ext = filename.rpartition('.')
+    # Leading dots do not start an extension
+    return '.' + ext.lower() if dot and stem.strip('.') else ''
+
+def _decompose_path(file_path: str, base_path: str) -> Tuple[str, str, str, Optional[str]]:
+    """Split a walked file path into (filename, extension, document type, subdirectory)"""
+    prefix = base_path.rstrip(os.sep) + os.sep
+    if file_path.startswith(prefix):
+        rel_path = file_path[len(prefix):]
+    else:
+        rel_path = os.path.relpath(file_path, base_path)
+    subdirectory, _, filename = rel_path.rpartition(os.sep)
+    # Use the top-level directory as the document type
+    doc_type = rel_path.partition(os.sep)[0] if subdirectory else "root_files"
+    return filename, _file_ext(filename), doc_type, subdirectory or None
+
+def _prefetch(file_path: Optional[str]) -> None:
+    """Ask the kernel to start reading a file into the page cache, where supported"""
+    if file_path is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
         try:
-            enhanced_project_docs = self.load_enhanced_project_documents()
-            documents.extend(enhanced_project_docs)
-            logger.info(f"Added {len(enhanced_project_docs)} enhanced project documents")
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        # Only a hint; the loader reports real read errors
+        pass
+
+def _walked_entry(entry: os.DirEntry) -> WalkedFile:
+    """WalkedFile from a scandir entry; unknown stats are left for the loader to report"""
+    try:
+        entry_stat = entry.stat()
+    except OSError:
+        return WalkedFile(entry.path, None, None)
+    return WalkedFile(entry.path, entry_stat.st_size, entry_stat.st_mtime_ns)
+
+def _open_loader_cache(namespace: str) -> Optional[LoaderCache]:
+    """Open the loader cache, or None if it is unavailable"""
+    try:
+        return LoaderCache(config.CACHE_DIR, namespace)
+    except Exception as e:
+        logger.warning(f"Loader cache unavailable: {e}")
+        return None
+
+def _cache_lookup(cache: Optional[LoaderCache], files: List[WalkedFile]) -> Dict[str, List[Document]]:
+    """Cached documents for unchanged files, treating any cache failure as all misses"""
+    if cache is None:
+        return {}
+    try:
+        return cache.get_many(files)
+    except Exception as e:
+        logger.warning(f"Could not read loader cache: {e}")
+        return {}
+
+def _cache_store(cache: Optional[LoaderCache], items: List[Tuple[WalkedFile, List[Document]]]) -> None:
+    """Save newly loaded documents, logging rather than failing the load"""
+    if cache is None:
+        return
+    try:
+        cache.set_many(items)
+    except Exception as e:
+        logger.warning(f"Could not update loader cache: {e}")
+
+def _read_text(file_path: str) -> str:
+    """Read a text file with a single read, decoding as UTF-8 or else the detected encoding"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            # Decode straight from the mapped file rather than copying it into a bytes object first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                text = _decode(data)
+        else:
+            text = _decode(f.read())
+    # Match text-mode reads, which translate \r\n and \r to \n
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def _decode(data) -> str:
+    """Decode a bytes-like buffer as UTF-8, or else the detected encoding"""
+    try:
+        return str(data, 'utf-8')
+    except UnicodeDecodeError:
+        return _decode_detected(data)
+
+def _decode_detected(data) -> str:
+    """Decode non-UTF-8 bytes using one charset detection pass, falling back to latin-1"""
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(bytes(data)).best()
+        # Without any language evidence (typical of short files) the guess is arbitrary
+        if best is not None and best.coherence > 0:
+            return str(data, best.encoding, 'replace')
+    return str(data, 'latin-1')
+
+def _iter_pdf_pages(file_path: str) -> Iterator[Document]:
+    """Yield a PDF's pages one at a time as Documents, preferring PyMuPDF over the much slower pypdf"""
+    if pymupdf is not None:
+        try:
+            # Extract every page before yielding, so a failure on any page can still fall back to pypdf;
+            # only the page texts are kept, and the PyMuPDF document is closed before the first yield
+            with pymupdf.open(file_path) as pdf:
+                pages = [(page.number, page.get_text("text")) for page in pdf]
         except Exception as e:
-            logger.error(f"Could not load enhanced project documents: {e}")
-        
-        # Filter large documents (except projects)
-        filtered_docs = []
-        for doc in documents:
-            doc_size = len(doc.page_content)
-            doc_type = doc.metadata.get('doc_type', 'unknown')
+            logger.debug(f"PyMuPDF could not read {file_path}, falling back to pypdf: {e}")
+        else:
+            for number, text in pages:
+                yield Document(page_content=text, metadata={"source": file_path, "page": number})
+            return
+    
+    yield from PyPDFLoader(file_path).lazy_load()
+
+def _load_excel(file_path: str, filename: str) -> Document:
+    """Load a workbook as a single Document; workbook and DataFrame references end with the call"""
+    if filename.lower().endswith('.xlsx'):
+        # Stream only the rows we keep rather than parsing whole sheets
+        content_parts = _xlsx_sheet_contents(file_path)
+    else:
+        content_parts = _xls_sheet_contents(file_path)
+    
+    combined_content = f"Excel File: {filename}\\n\\n" + "\\n\\n---\\n\\n".join(content_parts)
+    return Document(page_content=combined_content, metadata={"source": file_path})
+
+def _sheet_content(sheet_name: str, n_rows: int, n_cols: int, sample: pd.DataFrame) -> str:
+    """Render one sheet's summary, identically for .xlsx and .xls workbooks"""
+    sheet_content = f"Sheet: {sheet_name}\\n"
+    sheet_content += f"Shape: {n_rows} rows, {n_cols} columns\\n"
+    sheet_content += f"Columns: {', '.join(sample.columns.astype(str))}\\n\\n"
+    sheet_content += sample.to_string(index=False)
+    return sheet_content
+
+def _xls_sheet_contents(file_path: str, max_rows: int = 100) -> List[str]:
+    """Summarise each sheet of a legacy .xls from its first max_rows rows"""
+    content_parts = []
+    with pd.ExcelFile(file_path) as excel_file:
+        for sheet_name in excel_file.sheet_names:
+            # Parse only the sample rows; the full row count comes from the sheet itself
+            df = excel_file.parse(sheet_name, nrows=max_rows)
+            if df.empty:
+                continue
+            n_rows = max(excel_file.book.sheet_by_name(sheet_name).nrows - 1, 0)
+            content_parts.append(_sheet_content(sheet_name, n_rows, df.shape[1], df))
+            # Drop this sheet's frame before parsing the next one
+            del df
+    return content_parts
+
+def _xlsx_frame(rows: List[tuple]) -> pd.DataFrame:
+    """DataFrame from a header row and data rows, with the columns and empty cells pandas would give"""
+    header = [f"Unnamed: {i}" if value is None else str(value) for i, value in enumerate(rows[0])]
+    
+    # Repeated headers become name.1, name.2, ... skipping names already in the header, as in pd.read_excel
+    names, counts = set(header), {}
+    for i, name in enumerate(header):
+        count = counts.get(name, 0)
+        base = name
+        while count:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        header[i] = name
+        counts[name] = count + 1
+    
+    # Empty cells become NaN, as when pandas parses the sheet
+    return pd.DataFrame(
+        [[float('nan') if value is None else value for value in row] for row in rows[1:]], columns=header
+    ).infer_objects()
+
+def _xlsx_sheet_contents(file_path: str, max_rows: int = 100) -> List[str]:
+    """Summarise each sheet of an .xlsx from its header and first max_rows rows, read in streaming mode"""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        content_parts = []
+        for worksheet in workbook.worksheets:
+            rows = list(islice(worksheet.iter_rows(values_only=True), max_rows + 1))
+            if len(rows) < 2:
+                # Empty (or header-only) sheet
+                continue
+            df = _xlsx_frame(rows)
             
-            # Keep all project documents regardless of size
-            if doc_type == 'Projects' or doc_size <= self.max_file_size:
-                filtered_docs.append(doc)
+            # Read-only sheets report their size from the stored dimensions, without a full scan
+            n_rows = max((worksheet.max_row or len(rows)) - 1, 0)
+            n_cols = worksheet.max_column or len(df.columns)
+            content_parts.append(_sheet_content(worksheet.title, n_rows, n_cols, df))
+            del df
+        return content_parts
+    finally:
+        workbook.close()
+
+def _xlsx_head(file_path: str, n: int) -> Tuple[pd.DataFrame, int]:
+    """First sheet's header and first n rows as a DataFrame, plus its total row count"""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = list(islice(worksheet.iter_rows(values_only=True), n + 1))
+        if not rows:
+            return pd.DataFrame(), 0
+        n_rows = max((worksheet.max_row or len(rows)) - 1, 0)
+        return _xlsx_frame(rows), n_rows
+    finally:
+        workbook.close()
+
+def _load_one(file_path: str, file_size: Optional[int], base_path: str, max_file_size: int,
+              next_path: Optional[str] = None) -> Tuple[List[Document], str]:
+    """Load a single file, returning its documents and a status ('loaded', 'too_large' or 'error')
+    
+    Module-level so it can be pickled to ProcessPoolExecutor workers. Workers get consecutive
+    files, so next_path is usually this worker's next file and is prefetched while this one parses.
+    """
+    _prefetch(next_path)
+    documents = []
+    try:
+        # Check file size first
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
+        if file_size > max_file_size:
+            return documents, "too_large"
+            
+        # Get name, type and subdirectory for metadata from one decomposition of the path
+        filename, file_ext, doc_type, subdirectory = _decompose_path(file_path, base_path)
         
-        logger.info(f"Using {len(filtered_docs)} documents after filtering")
+        # Load based on file type
+        if file_ext in _TEXT_EXTS:
+            try:
+                # Try UTF-8, then the detected encoding, on the same bytes
+                doc = Document(page_content=_read_text(file_path), metadata={"source": file_path})
+                documents.append(DocumentProcessor.add_metadata(doc, doc_type, file_ext[1:], subdirectory))
+            except Exception as e:
+                logger.warning(f"Could not load {filename}: {e}")
+                return documents, "error"
+                    
+        elif file_ext == '.pdf':
+            try:
+                for pdf_doc in _iter_pdf_pages(file_path):
+                    documents.append(DocumentProcessor.add_metadata(pdf_doc, doc_type, "pdf", subdirectory))
+            except Exception as e:
+                logger.warning(f"Could not load PDF {filename}: {e}")
+                return documents, "error"
+                
+        elif file_ext in _WORD_EXTS:
+            try:
+                loader = Docx2txtLoader(file_path)
+                doc = loader.load()[0]
+                documents.append(DocumentProcessor.add_metadata(doc, doc_type, "docx", subdirectory))
+            except Exception as e:
+                logger.warning(f"Could not load Word file {filename}: {e}")
+                return documents, "error"
+                
+        elif file_ext in _EXCEL_EXTS:
+            try:
+                doc = _load_excel(file_path, filename)
+                documents.append(DocumentProcessor.add_metadata(doc, doc_type, "excel", subdirectory))
+            except Exception as e:
+                logger.warning(f"Could not load Excel file {filename}: {e}")
+                return documents, "error"
+                
+    except Exception as e:
+        logger.error(f"Error processing {file_path}: {e}")
+        return documents, "error"
+    
+    return documents, "loaded"
+
+def _load_project_file(file_path: str, next_path: Optional[str] = None) -> List[Document]:
+    """Load a single project file with enhanced context (module-level for ProcessPoolExecutor)"""
+    _prefetch(next_path)
+    documents = []
+    try:
+        filename = file_path.rpartition(os.sep)[2]
+        file_ext = _file_ext(filename)
+        project_name = DocumentProcessor.determine_project_name(file_path)
         
-        # Chunk the documents
-        chunks = self.chunk_documents(filtered_docs)
+        # Skip temporary files
+        if filename.startswith('~$') or filename.startswith('.'):
+            return documents
+            
+        logger.debug(f"Processing: {filename} (Project: {project_name})")
         
-        # Safety check - limit chunks if too many
-        if len(chunks) > 5000:
-            logger.warning(f"Too many chunks ({len(chunks)}). Sampling 5000 representative chunks.")
-            import random
-            random.seed(42)
-            chunks = random.sample(chunks, 5000)
+        # Enhanced metadata function
+        def add_enhanced_metadata(doc, doc_type, file_type, project_name):
+            doc.metadata["doc_type"] = doc_type
+            doc.metadata["file_type"] = file_type
+            doc.metadata["company"] = "Company"
+            doc.metadata["project"] = project_name
+            return doc
         
-        logger.info(f"Document processing completed - Total: {len(chunks)} chunks")
-        return chunks
\ No newline at end of file
+        # Load different file types with enhanced context
+        if file_ext == '.pdf':
+            try:
+                for doc in _iter_pdf_pages(file_path):
+                    # Add company context to the document content
+                    enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nDocument: {filename}\\n\\n{doc.page_content}"
+                    doc.page_content = enhanced_content
+                    documents.append(add_enhanced_metadata(doc, "Projects", "pdf", project_name))
+            except Exception as e:
+                logger.warning(f"Could not read PDF {filename}: {e}")
+                
+        elif file_ext in _WORD_EXTS:
+            try:
+                content = docx2txt.process(file_path)
+                if content.strip():
+                    enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nDocument: {filename}\\n\\n{content}"
+                    doc = Document(page_content=enhanced_content, metadata={"source": file_path})
+                    documents.append(add_enhanced_metadata(doc, "Projects", "docx", project_name))
+            except Exception as e:
+                logger.warning(f"Could not read Word doc {filename}: {e}")
+                
+        elif file_ext == '.txt':
+            try:
+                content = _read_text(file_path)
+                
+                if content:
+                    enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nScript/Document: {filename}\\n\\n{content}"
+                    doc = Document(page_content=enhanced_content, metadata={"source": file_path})
+                    documents.append(add_enhanced_metadata(doc, "Projects", "text", project_name))
+            except Exception as e:
+                logger.warning(f"Could not read text file {filename}: {e}")
+                
+        elif file_ext == '.sql':
+            try:
+                content = _read_text(file_path)
+                enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nSQL Script: {filename}\\n\\n{content}"
+                doc = Document(page_content=enhanced_content, metadata={"source": file_path})
+                documents.append(add_enhanced_metadata(doc, "Projects", "sql", project_name))
+            except Exception as e:
+                logger.warning(f"Could not read SQL file {filename}: {e}")
+                
+        elif file_ext in _SPREADSHEET_EXTS:
+            try:
+                if file_ext == '.csv':
+                    df = pd.read_csv(file_path)
+                    n_rows = len(df)
+                elif file_ext == '.xlsx':
+                    # Only the sample rows are parsed; the row count comes from the sheet dimensions
+                    df, n_rows = _xlsx_head(file_path, 5)
+                else:
+                    df = pd.read_excel(file_path)
+                    n_rows = len(df)
+                
+                # Create a summary of the spreadsheet
+                summary = f"Spreadsheet with {n_rows} rows and {len(df.columns)} columns\\n"
+                summary += f"Columns: {', '.join(df.columns.tolist())}\\n"
+                summary += f"Sample data:\\n{df.head().to_string()}"
+                
+                enhanced_content = f"ARTILIGENCE PROJECT: {project_name}\\n\\nSpreadsheet: {filename}\\n\\n{summary}"
+                doc = Document(page_content=enhanced_content, metadata={"source": file_path})
+                documents.append(add_enhanced_metadata(doc, "Projects", "spreadsheet", project_name))
+            except Exception as e:
+                logger.warning(f"Could not read spreadsheet {filename}: {e}")
+                
+    except Exception as e:
+        logger.warning(f"Could not process {os.path.basename(file_path)}: {e}")
+    
+    return documents
+
+@lru_cache(maxsize=4096)
+def _classify_dir(dir_path: str) -> Tuple[Optional[str], str]:
+    """Classify a directory once, returning (keyword match, folder-name fallback)"""
+    dir_project = next((project for project, pattern in _PATH_PATTERNS if pattern.search(dir_path)), None)
+    
+    # Extract folder name as project for other directories
+    folder_project = "General Project"
+    for part in reversed(dir_path.split('/')):
+        if part != 'Projects':
+            folder_project = next(
+                (project for project, pattern in _FOLDER_PATTERNS if pattern.search(part)),
+                part.replace('_', ' ').title()
+            )
+            break
+    return dir_project, folder_project
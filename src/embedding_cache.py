@@ -0,0 +1,59 @@
+"""
+Persistent embedding cache for Company Knowledge Worker
+"""
+
+import os
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Disk cache of embedding vectors keyed by content hash and model name"""
+
+    # Stay well below SQLite's bound-parameter limit
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, cache_dir: str, model: str):
+        self.model = model
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_file = os.path.join(cache_dir, "embeddings.sqlite3")
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_file)
+
+    def key_for(self, text: str) -> str:
+        """Build the cache key for a text under the configured model"""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{digest}:{self.model}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for whichever keys are present"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with closing(self._connect()) as conn:
+            for start in range(0, len(unique_keys), self._LOOKUP_BATCH):
+                batch = unique_keys[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def set_many(self, items: Iterable[Tuple[str, List[float]]]) -> None:
+        """Store vectors for the given keys"""
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        if not rows:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+        logger.debug(f"Cached {len(rows)} embeddings")
@@ -2,49 +2,146 @@
 Improved RAG Pipeline with better project coverage
 """
 
+import re
+import time
+import hashlib
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from enum import IntEnum
+from functools import wraps
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from collections import defaultdict
 
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+import numpy as np
+from langchain.memory import ConversationSummaryBufferMemory
 from langchain.chains import ConversationalRetrievalChain
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 
 from .config import config
-from .vector_store import VectorStoreManager
+from .vector_store import VectorStoreManager, background_loop
+from .rag_pipeline import get_llm, stream_chain_answer
+from .semantic_cache import SemanticCache, CentroidCache, is_follow_up
 
 logger = logging.getLogger(__name__)
 
+# Near-duplicate queries ("current projects" vs "all current projects") reuse retrieved documents
+RETRIEVAL_CACHE_THRESHOLD = 0.92
+RETRIEVAL_CACHE_SIZE = 256
+
+# Paraphrases of "list all projects" share one answer per cluster of query embeddings
+ANSWER_CACHE_THRESHOLD = 0.86
+ANSWER_CLUSTER_THRESHOLD = 0.75
+
+# Seconds a rendered project summary answers "list projects" questions without the LLM
+PROJECT_INFO_TTL = 300
+_PROJECT_INFO_UNAVAILABLE = "Unable to retrieve comprehensive project information."
+
+# All known projects
+KNOWN_PROJECTS = (
+    "SQL Server Upgrades",
+    "SFMS Mining Analytics",
+    "Precision Agriculture Asset Management",
+    "Database Migration",
+    "Advanced Driver Assistance System"
+)
+
+# Query keyword checks, compiled once into case-insensitive alternations (substring semantics)
+_PROJECT_KEYWORDS = ('projects', 'working on', 'current projects', 'all projects')
+_COMPREHENSIVE_KEYWORDS = (
+    'what projects', 'all projects', 'current projects',
+    'list projects', 'projects working on', 'company projects'
+)
+_PROJECT_QUERY_RE = re.compile('|'.join(map(re.escape, _PROJECT_KEYWORDS)), re.IGNORECASE)
+_COMPREHENSIVE_QUERY_RE = re.compile('|'.join(map(re.escape, _COMPREHENSIVE_KEYWORDS)), re.IGNORECASE)
+
+class QueryKind(IntEnum):
+    """How much project coverage a question needs"""
+    GENERIC = 0
+    PROJECT = 1
+    COMPREHENSIVE = 2
+
+# Kind of the question being answered, so the retriever doesn't classify it again
+_query_kind: ContextVar[Optional[QueryKind]] = ContextVar('query_kind', default=None)
+
+def _classify_query(question: str) -> QueryKind:
+    """Classify a question once by its project keywords"""
+    if _COMPREHENSIVE_QUERY_RE.search(question):
+        return QueryKind.COMPREHENSIVE
+    if _PROJECT_QUERY_RE.search(question):
+        return QueryKind.PROJECT
+    return QueryKind.GENERIC
+
+def _content_key(text: str) -> bytes:
+    """64-bit content digest, for dropping duplicate chunks"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+def _centroid_cached(ask):
+    """Answer from the centroid cache when a question is close to an earlier cluster of questions"""
+    @wraps(ask)
+    async def wrapper(self, question: str) -> Dict[str, Any]:
+        if not self._answer_cacheable(question):
+            return await ask(self, question)
+        
+        try:
+            query_vector = await asyncio.to_thread(self.vector_store_manager.embeddings.embed_query, question)
+        except Exception as e:
+            logger.warning(f"Could not embed question for answer cache: {e}")
+            return await ask(self, question)
+        
+        cached = self.answer_cache.lookup(query_vector)
+        if cached is not None:
+            self._remember_turn(question, cached["answer"])
+            return {**cached, "question": question, "cached": True}
+        
+        result = await ask(self, question)
+        if result.get("success"):
+            self.answer_cache.add(query_vector, result)
+        return result
+    return wrapper
+
 class ImprovedRAGPipeline:
     """Enhanced RAG pipeline with better project coverage"""
     
+    # Prompt for comprehensive project questions, filled in a single pass
+    _COMPREHENSIVE_TPL = (
+        "Based on comprehensive analysis of company documents, here are ALL the current projects:\n\n"
+        "{info}\n\n"
+        "Original question: {q}"
+    )
+    
     def __init__(self, vector_store_manager: VectorStoreManager):
         self.vector_store_manager = vector_store_manager
         self.llm = None
         self.memory = None
         self.conversation_chain = None
+        self.answer_cache = CentroidCache(ANSWER_CACHE_THRESHOLD, ANSWER_CLUSTER_THRESHOLD)
+        # (rendered project summary, monotonic expiry), refreshed under the lock
+        self._project_info_cache: Optional[Tuple[str, float]] = None
+        self._project_info_lock = threading.Lock()
+        # Unit-normalised probe embeddings for KNOWN_PROJECTS, shape (projects, dim), embedded once
+        self._project_embeds: Optional[np.ndarray] = None
         self._initialize_pipeline()
     
     def _initialize_pipeline(self):
         """Initialize the RAG pipeline components"""
         try:
             # Initialize the language model
-            self.llm = ChatOpenAI(
-                temperature=0.7, 
-                model_name=config.MODEL,
-                openai_api_key=config.OPENAI_API_KEY
-            )
+            self.llm = get_llm(config.MODEL, 0.7)
             logger.info(f"Language model initialized: {config.MODEL}")
             
-            # Set up conversation memory
-            self.memory = ConversationBufferMemory(
+            # Set up conversation memory; older turns are summarized so the
+            # prompt stays bounded on long sessions
+            self.memory = ConversationSummaryBufferMemory(
+                llm=self.llm,
                 memory_key='chat_history', 
-                return_messages=True
+                return_messages=True,
+                max_token_limit=config.MEMORY_TOKEN_LIMIT
             )
-            logger.info("Conversation memory initialized")
+            logger.info(f"Conversation summary memory initialized (max {config.MEMORY_TOKEN_LIMIT} tokens)")
             
             # Create enhanced retriever
             retriever = self._create_enhanced_retriever()
@@ -71,68 +168,114 @@ class ImprovedRAGPipeline:
                 self.vector_store_manager = vector_store_manager
                 self.base_k = base_k
                 self.vectorstore = vector_store_manager.get_vectorstore()
+                # Same embedding model as the store, so query similarities are consistent with it
+                self.embeddings = vector_store_manager.embeddings
+                self.query_cache = SemanticCache(RETRIEVAL_CACHE_THRESHOLD, max_entries=RETRIEVAL_CACHE_SIZE)
             
             def _get_relevant_documents(
                 self, query: str, *, run_manager: CallbackManagerForRetrieverRun
             ) -> List[Document]:
                 """Get relevant documents with improved project diversity"""
                 
-                # Check if this is a broad project query
-                project_keywords = ['projects', 'working on', 'current projects', 'all projects']
-                is_project_query = any(keyword in query.lower() for keyword in project_keywords)
+                query_vector = self.embeddings.embed_query(query)
+                cached_docs = self.query_cache.lookup(query_vector)
+                if cached_docs is not None:
+                    return cached_docs
                 
-                if is_project_query:
-                    return self._get_diverse_project_documents(query)
+                # Check if this is a broad project query, reusing the classification from ask_question
+                query_kind = _query_kind.get()
+                if query_kind is None:
+                    query_kind = _classify_query(query)
+                
+                if query_kind >= QueryKind.PROJECT:
+                    docs = self._get_diverse_project_documents(query_vector)
                 else:
                     # For specific queries, use higher k but standard retrieval
-                    return self.vectorstore.similarity_search(query, k=min(self.base_k, 25))
+                    docs = self.vectorstore.similarity_search_by_vector(query_vector, k=min(self.base_k, 25))
+                
+                self.query_cache.add(query_vector, docs)
+                return docs
             
-            def _get_diverse_project_documents(self, query: str) -> List[Document]:
+            def _get_diverse_project_documents(self, query_vector: List[float]) -> List[Document]:
                 """Get diverse documents covering multiple projects"""
                 
-                # Get more initial candidates
-                candidates = self.vectorstore.similarity_search(query, k=self.base_k)
+                # Get more initial candidates, with their distances
+                candidates = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    query_vector, k=self.base_k
+                )
+                if not candidates:
+                    return []
                 
-                # Group by project to ensure diversity
-                project_groups = defaultdict(list)
-                other_docs = []
+                # Walk candidates nearest first so each project keeps its true top documents
+                distances = np.fromiter((distance for _, distance in candidates), dtype=np.float32, count=len(candidates))
+                selected_docs = []
+                seen = set()
+                project_counts = defaultdict(int)
+                other_count = 0
                 
-                for doc in candidates:
+                for index in np.argsort(distances, kind='stable'):
+                    doc = candidates[index][0]
+                    # Duplicate chunks would only spend context tokens and a slot
+                    key = _content_key(doc.page_content)
+                    if key in seen:
+                        continue
                     project = doc.metadata.get('project')
                     if project and project != 'Unknown':
-                        project_groups[project].append(doc)
+                        # Up to 4 documents per project
+                        if project_counts[project] >= 4:
+                            continue
+                        project_counts[project] += 1
                     else:
-                        other_docs.append(doc)
-                
-                # Select diverse documents
-                selected_docs = []
-                
-                # Take top documents from each project (up to 4 per project)
-                for project, docs in project_groups.items():
-                    selected_docs.extend(docs[:4])
-                
-                # Add some general documents
-                selected_docs.extend(other_docs[:5])
+                        # Add some general documents
+                        if other_count >= 5:
+                            continue
+                        other_count += 1
+                    seen.add(key)
+                    selected_docs.append(doc)
+                    
+                    # Limit total to reasonable number
+                    if len(selected_docs) == 25:
+                        break
                 
-                # Limit total to reasonable number
-                return selected_docs[:25]
+                return selected_docs
         
         return EnhancedRetriever(self.vector_store_manager)
     
+    def _answer_cacheable(self, question: str) -> bool:
+        """Only standalone "list all projects" questions share answers"""
+        # Specific project questions embed close to each other, and follow-ups depend on history;
+        # memory is shared by every web session, so only the question itself can mark a follow-up
+        return _classify_query(question) is QueryKind.COMPREHENSIVE and not is_follow_up(question)
+    
+    def _remember_turn(self, question: str, answer: str) -> None:
+        """Record a cache-served turn in memory, as the chain would have"""
+        if self.memory:
+            try:
+                self.memory.save_context({"question": question}, {"answer": answer})
+            except Exception as e:
+                logger.warning(f"Could not save cached answer to memory: {e}")
+    
     def ask_question(self, question: str) -> Dict[str, Any]:
         """Ask a question with enhanced project coverage"""
+        return asyncio.run_coroutine_threadsafe(self.aask_question(question), background_loop()).result()
+    
+    @_centroid_cached
+    async def aask_question(self, question: str) -> Dict[str, Any]:
+        """Ask a question with enhanced project coverage, without blocking the event loop"""
         if not self.conversation_chain:
             raise ValueError("Enhanced RAG pipeline not initialized")
         
+        query_kind = _classify_query(question)
+        token = _query_kind.set(query_kind)
         try:
             logger.info(f"Processing enhanced question: {question}")
             
             # Check if this needs special project handling
-            if self._is_comprehensive_project_query(question):
-                return self._handle_comprehensive_project_query(question)
+            if query_kind is QueryKind.COMPREHENSIVE:
+                return await self._handle_comprehensive_project_query(question)
             else:
                 # Use standard enhanced pipeline
-                result = self.conversation_chain.invoke({"question": question})
+                result = await self.conversation_chain.ainvoke({"question": question})
                 
                 response = {
                     "question": question,
@@ -153,33 +296,95 @@ class ImprovedRAGPipeline:
                 "error": str(e),
                 "enhanced": True
             }
+        finally:
+            _query_kind.reset(token)
+    
+    def ask_question_stream(self, question: str) -> Iterator[str]:
+        """Ask a question and yield the answer progressively as tokens arrive"""
+        if not self.conversation_chain:
+            raise ValueError("Enhanced RAG pipeline not initialized")
+        
+        query_vector, cached = None, None
+        if self._answer_cacheable(question):
+            try:
+                query_vector = self.vector_store_manager.embeddings.embed_query(question)
+                cached = self.answer_cache.lookup(query_vector)
+            except Exception as e:
+                logger.warning(f"Could not embed question for answer cache: {e}")
+        if cached is not None:
+            self._remember_turn(question, cached["answer"])
+            yield cached["answer"]
+            return
+        
+        try:
+            logger.info(f"Processing streamed enhanced question: {question}")
+            answer = ""
+            if _classify_query(question) is QueryKind.COMPREHENSIVE:
+                for answer in self._stream_comprehensive_project_query(question):
+                    yield answer
+            else:
+                for answer in stream_chain_answer(self.conversation_chain, {"question": question}):
+                    yield answer
+            
+            if query_vector is not None and answer:
+                self.answer_cache.add(query_vector, {
+                    "question": question,
+                    "answer": answer,
+                    "success": True,
+                    "enhanced": True
+                })
+            logger.info("Successfully streamed enhanced answer")
+            
+        except Exception as e:
+            logger.error(f"Error processing enhanced question: {e}")
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    def _stream_comprehensive_project_query(self, question: str) -> Iterator[str]:
+        """Stream the comprehensive project answer, so the first tokens show before the full completion"""
+        try:
+            cached_info, project_info = self._project_information()
+            if cached_info is not None:
+                yield cached_info
+                return
+            
+            answer = ""
+            for chunk in self.llm.stream(self._comprehensive_context(question, project_info)):
+                answer += chunk.content
+                yield answer
+            
+        except Exception as e:
+            logger.error(f"Error in comprehensive project query: {e}")
+            # Fallback to standard method
+            yield from stream_chain_answer(self.conversation_chain, {"question": question})
+    
+    @classmethod
+    def _comprehensive_context(cls, question: str, project_info: str) -> str:
+        """Build the LLM prompt for a comprehensive project question"""
+        return cls._COMPREHENSIVE_TPL.format_map({'info': project_info, 'q': question})
     
     def _is_comprehensive_project_query(self, question: str) -> bool:
         """Check if this is a query that needs comprehensive project coverage"""
-        comprehensive_keywords = [
-            'what projects', 'all projects', 'current projects', 
-            'list projects', 'projects working on', 'company projects'
-        ]
-        return any(keyword in question.lower() for keyword in comprehensive_keywords)
+        return _classify_query(question) is QueryKind.COMPREHENSIVE
     
-    def _handle_comprehensive_project_query(self, question: str) -> Dict[str, Any]:
+    async def _handle_comprehensive_project_query(self, question: str) -> Dict[str, Any]:
         """Handle queries that need comprehensive project information"""
         
         try:
-            # Get project-specific information
-            project_info = self._get_all_project_information()
+            # The store scan (and any wait on a concurrent refresh) runs off the event loop
+            cached_info, project_info = await asyncio.to_thread(self._project_information)
             
-            # Create enhanced context
-            enhanced_context = f"""
-            Based on comprehensive analysis of company documents, here are ALL the current projects:
-
-            {project_info}
-            
-            Original question: {question}
-            """
+            if cached_info is not None:
+                return {
+                    "question": question,
+                    "answer": cached_info,
+                    "success": True,
+                    "enhanced": True,
+                    "comprehensive": True,
+                    "cached": True
+                }
             
             # Get LLM response with enhanced context
-            response = self.llm.invoke(enhanced_context)
+            response = await self.llm.ainvoke(self._comprehensive_context(question, project_info))
             
             return {
                 "question": question,
@@ -192,7 +397,7 @@ class ImprovedRAGPipeline:
         except Exception as e:
             logger.error(f"Error in comprehensive project query: {e}")
             # Fallback to standard method
-            result = self.conversation_chain.invoke({"question": question})
+            result = await self.conversation_chain.ainvoke({"question": question})
             return {
                 "question": question,
                 "answer": result["answer"],
@@ -201,56 +406,123 @@ class ImprovedRAGPipeline:
                 "fallback": True
             }
     
+    def _project_information(self) -> Tuple[Optional[str], Optional[str]]:
+        """Return (fresh rendered summary, None), or (None, newly gathered project information)"""
+        # A fresh project summary answers directly, without an LLM round trip
+        cached_info = self._fresh_project_information()
+        if cached_info is not None:
+            return cached_info, None
+        
+        with self._project_info_lock:
+            # Another thread may have refreshed it while we waited
+            cached_info = self._fresh_project_information()
+            if cached_info is not None:
+                return cached_info, None
+            
+            project_info = self._get_all_project_information()
+            if project_info != _PROJECT_INFO_UNAVAILABLE:
+                self._project_info_cache = (
+                    self._render_project_information(project_info),
+                    time.monotonic() + PROJECT_INFO_TTL
+                )
+            return None, project_info
+    
+    def _fresh_project_information(self) -> Optional[str]:
+        """Return the rendered project summary if it has not expired"""
+        cached = self._project_info_cache
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+    
+    @staticmethod
+    def _render_project_information(project_info: str) -> str:
+        """Render the project summary as a standalone markdown answer"""
+        summaries = project_info.strip()
+        return f"Based on comprehensive analysis of company documents, here are ALL the current projects:\n\n{summaries}"
+    
+    def _project_embeddings(self) -> np.ndarray:
+        """Embed the project probes in one request, normalised for cosine scoring"""
+        if self._project_embeds is None:
+            probes = [f"ARTILIGENCE PROJECT: {project}" for project in KNOWN_PROJECTS]
+            embeds = np.asarray(self.vector_store_manager.embeddings.embed_documents(probes), dtype=np.float32)
+            embeds /= np.linalg.norm(embeds, axis=1, keepdims=True)
+            self._project_embeds = embeds
+        return self._project_embeds
+    
     def _get_all_project_information(self) -> str:
         """Get comprehensive information about all projects"""
         
         try:
-            vectorstore = self.vector_store_manager.get_vectorstore()
-            
-            # Define all known projects
-            projects = [
-                "SQL Server Upgrades",
-                "SFMS Mining Analytics", 
-                "Precision Agriculture Asset Management",
-                "Database Migration",
-                "Advanced Driver Assistance System"
-            ]
+            collection = self.vector_store_manager.collection
+            projects = list(KNOWN_PROJECTS)
             
             project_summaries = []
             
-            for project in projects:
-                # Get project-specific documents
-                project_query = f"ARTILIGENCE PROJECT: {project}"
-                docs = vectorstore.similarity_search(project_query, k=8)
+            # One metadata-filtered scan with vectors, ranked against every project probe in a single matmul
+            raw = collection.get(
+                where={"project": {"$in": projects}},
+                include=["documents", "metadatas", "embeddings"]
+            )
+            groups = {}
+            if raw["ids"]:
+                doc_embeds = np.asarray(raw["embeddings"], dtype=np.float32)
+                norms = np.linalg.norm(doc_embeds, axis=1, keepdims=True)
+                doc_embeds /= np.where(norms == 0, 1, norms)
+                scores = self._project_embeddings() @ doc_embeds.T
                 
-                # Filter for actual project docs
-                project_docs = [doc for doc in docs if doc.metadata.get('project') == project]
+                # Only a project's own documents can represent it
+                doc_projects = np.array([metadata["project"] for metadata in raw["metadatas"]])
+                scores[doc_projects[np.newaxis, :] != np.array(projects)[:, np.newaxis]] = -np.inf
+                
+                for row, project in enumerate(projects):
+                    # Over-fetch so duplicate chunks can be skipped and still leave 4 distinct ones
+                    count = min(16, int(np.isfinite(scores[row]).sum()))
+                    if not count:
+                        continue
+                    top = np.argpartition(-scores[row], count - 1)[:count]
+                    top = top[np.argsort(-scores[row][top])]
+                    
+                    seen = set()
+                    project_docs = []
+                    for i in top:
+                        key = _content_key(raw["documents"][i])
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        project_docs.append((raw["documents"][i], raw["metadatas"][i]))
+                        if len(project_docs) == 4:
+                            break
+                    groups[project] = project_docs
+            
+            for project in projects:
+                project_docs = groups.get(project)
                 
                 if project_docs:
                     # Get representative content
                     content_samples = []
                     sources = set()
                     
-                    for doc in project_docs[:4]:
-                        content_samples.append(doc.page_content[:300])
-                        source = doc.metadata.get('source', 'unknown')
+                    for doc_text, metadata in project_docs:
+                        content_samples.append(doc_text[:300])
+                        source = metadata.get('source', 'unknown')
                         if '/' in source:
                             sources.add(source.split('/')[-1])
                         else:
                             sources.add(source)
                     
-                    project_summary = f"""
-                    **{project}:**
-                    - Document sources: {', '.join(list(sources)[:5])}
-                    - Content sample: {content_samples[0] if content_samples else 'No content available'}
-                    """
+                    # Lines start unindented, so the markdown never renders as a code block
+                    project_summary = "\n".join([
+                        f"**{project}:**",
+                        f"- Document sources: {', '.join(list(sources)[:5])}",
+                        f"- Content sample: {content_samples[0] if content_samples else 'No content available'}"
+                    ])
                     project_summaries.append(project_summary)
             
-            return "\n".join(project_summaries)
+            return "\n\n".join(project_summaries)
             
         except Exception as e:
             logger.error(f"Error getting all project information: {e}")
-            return "Unable to retrieve comprehensive project information."
+            return _PROJECT_INFO_UNAVAILABLE
     
     def get_conversation_history(self) -> list:
         """Get the conversation history"""
@@ -0,0 +1,72 @@
+"""
+Persistent document loader cache for Company Knowledge Worker
+"""
+
+import os
+import pickle
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+class LoaderCache:
+    """Disk cache of loaded documents keyed by file path, modification time and size"""
+
+    # Stay well below SQLite's bound-parameter limit
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, cache_dir: str, namespace: str):
+        # Namespace separates loaders (and loader versions) that read the same files differently
+        self.namespace = namespace
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_file = os.path.join(cache_dir, "loader.sqlite3")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "namespace TEXT NOT NULL, path TEXT NOT NULL, mtime INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "blob BLOB NOT NULL, PRIMARY KEY (namespace, path))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_file)
+
+    def get_many(self, files: Sequence[Tuple[str, Optional[int], Optional[int]]]) -> Dict[str, List[Document]]:
+        """Return cached documents for (path, size, mtime_ns) entries that are unchanged on disk"""
+        wanted = {path: (mtime_ns, size) for path, size, mtime_ns in files if size is not None and mtime_ns is not None}
+        paths = list(wanted)
+        found = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(paths), self._LOOKUP_BATCH):
+                batch = paths[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT path, mtime, size, blob FROM files WHERE namespace = ? AND path IN ({placeholders})",
+                    [self.namespace, *batch]
+                )
+                for path, mtime, size, blob in rows:
+                    if wanted[path] != (mtime, size):
+                        continue
+                    try:
+                        found[path] = pickle.loads(blob)
+                    except Exception as e:
+                        logger.debug(f"Ignoring unreadable loader cache entry for {path}: {e}")
+        return found
+
+    def set_many(self, items: Iterable[Tuple[Tuple[str, Optional[int], Optional[int]], List[Document]]]) -> None:
+        """Store documents for (path, size, mtime_ns) entries in a single transaction"""
+        rows = [
+            (self.namespace, path, mtime_ns, size, pickle.dumps(documents, protocol=pickle.HIGHEST_PROTOCOL))
+            for (path, size, mtime_ns), documents in items
+            if size is not None and mtime_ns is not None
+        ]
+        if not rows:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (namespace, path, mtime, size, blob) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        logger.debug(f"Cached loaded documents for {len(rows)} files")
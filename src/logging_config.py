@@ -2,11 +2,27 @@
 Logging configuration for Company Knowledge Worker
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import multiprocessing
 from pathlib import Path
 
+# Background writer for the log file, so request threads only enqueue records
+_file_listener = None
+
+def _stop_file_listener():
+    """Flush queued records and stop the background log writer"""
+    global _file_listener
+    if _file_listener is not None:
+        _file_listener.stop()
+        for handler in _file_listener.handlers:
+            handler.close()
+        _file_listener = None
+
+atexit.register(_stop_file_listener)
+
 def setup_logging(log_level: str = "INFO", log_to_file: bool = True, log_dir: str = None):
     """Setup logging configuration for the application"""
     
@@ -25,6 +41,7 @@ def setup_logging(log_level: str = "INFO", log_to_file: bool = True, log_dir: st
     
     # Clear any existing handlers
     root_logger.handlers.clear()
+    _stop_file_listener()
     
     # Console handler
     console_handler = logging.StreamHandler()
@@ -48,11 +65,21 @@ def setup_logging(log_level: str = "INFO", log_to_file: bool = True, log_dir: st
         file_handler = logging.handlers.RotatingFileHandler(
             log_file,
             maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
+            backupCount=5,
+            delay=True  # Open the file on the first record
         )
         file_handler.setLevel(numeric_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        
+        # Writes and rotation happen on the listener thread; a process-shared queue
+        # lets forked loader workers, which inherit the queue handler, log through it too
+        global _file_listener
+        log_queue = multiprocessing.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(numeric_level)
+        root_logger.addHandler(queue_handler)
+        _file_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _file_listener.start()
         
         print(f"Logging to file: {log_file}")
     
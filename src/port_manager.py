@@ -4,70 +4,106 @@ Port management utilities for Company Knowledge Worker
 
 import os
 import socket
-import subprocess
 import time
 import logging
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
+
+import psutil
 
 logger = logging.getLogger(__name__)
 
+# Seconds a port probe result is reused by repeated checks of the same port
+PROBE_TTL = 0.5
+
 class PortManager:
     """Manages port availability and cleanup"""
     
     def __init__(self, preferred_port: int = 7860):
         self.preferred_port = preferred_port
+        # port -> (monotonic probe time, in use)
+        self._probe_cache: Dict[int, Tuple[float, bool]] = {}
         
     def is_port_in_use(self, port: int) -> bool:
         """Check if a port is currently in use"""
+        probed_at, in_use = self._probe_cache.get(port, (0.0, False))
+        if time.monotonic() - probed_at < PROBE_TTL:
+            return in_use
+        
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(1)
-                result = sock.connect_ex(('127.0.0.1', port))
-                return result == 0
+                # Loopback connects resolve immediately; only filtered ports wait this long
+                sock.settimeout(0.05)
+                in_use = sock.connect_ex(('127.0.0.1', port)) == 0
         except Exception as e:
             logger.debug(f"Error checking port {port}: {e}")
-            return False
+            in_use = False
+        
+        self._probe_cache[port] = (time.monotonic(), in_use)
+        return in_use
+    
+    def _forget_probe(self, port: int) -> None:
+        """Drop a cached probe result, e.g. after the process on the port was killed"""
+        self._probe_cache.pop(port, None)
+    
+    def _pid_on_port(self, port: int) -> Optional[int]:
+        """Return the PID listening on a TCP port"""
+        try:
+            for conn in psutil.net_connections(kind='inet'):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port:
+                    return conn.pid
+            return None
+        except psutil.AccessDenied:
+            # System-wide socket listing needs root on macOS; scan our user's processes instead
+            return self._pid_on_port_per_process(port)
+        except Exception as e:
+            logger.debug(f"Error finding PID on port {port}: {e}")
+            return None
+    
+    def _pid_on_port_per_process(self, port: int) -> Optional[int]:
+        """Find the PID listening on a port by checking each accessible process"""
+        for proc in psutil.process_iter():
+            try:
+                for conn in proc.net_connections(kind='inet'):
+                    if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port:
+                        return proc.pid
+            except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue
+        return None
     
     def get_process_using_port(self, port: int) -> Optional[dict]:
         """Get information about the process using a port"""
         try:
-            # Use lsof to find process using the port
-            result = subprocess.run(
-                ['lsof', '-i', f':{port}', '-t'], 
-                capture_output=True, 
-                text=True,
-                timeout=5
-            )
+            pid = self._pid_on_port(port)
+            if pid is None:
+                return None
             
-            if result.returncode == 0 and result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                if pids:
-                    pid = pids[0]
-                    
-                    # Get process details
-                    ps_result = subprocess.run(
-                        ['ps', '-p', pid, '-o', 'pid,ppid,command'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    
-                    if ps_result.returncode == 0:
-                        lines = ps_result.stdout.strip().split('\n')
-                        if len(lines) > 1:
-                            parts = lines[1].split(None, 2)
-                            if len(parts) >= 3:
-                                return {
-                                    'pid': int(parts[0]),
-                                    'ppid': int(parts[1]),
-                                    'command': parts[2]
-                                }
-            return None
+            # Get process details
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                return {
+                    'pid': pid,
+                    'ppid': proc.ppid(),
+                    'command': ' '.join(proc.cmdline()) or proc.name()
+                }
             
         except Exception as e:
             logger.debug(f"Error getting process info for port {port}: {e}")
             return None
     
+    def _terminate(self, pid: int, graceful: bool = True) -> None:
+        """Stop a process, escalating from SIGTERM to SIGKILL if it does not exit"""
+        proc = psutil.Process(pid)
+        if graceful:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+                return
+            except psutil.TimeoutExpired:
+                logger.info(f"Process {pid} still running, using SIGKILL")
+        proc.kill()
+        proc.wait(timeout=1)
+    
     def kill_process_on_port(self, port: int, force: bool = False) -> bool:
         """Kill the process using a specific port"""
         try:
@@ -87,18 +123,14 @@ class PortManager:
                 
                 # Try graceful termination first
                 try:
-                    subprocess.run(['kill', '-TERM', str(pid)], timeout=5)
-                    time.sleep(2)
-                    
-                    # Check if process is still running
-                    if self.is_port_in_use(port):
-                        logger.info(f"Process {pid} still running, using SIGKILL")
-                        subprocess.run(['kill', '-KILL', str(pid)], timeout=5)
-                        time.sleep(1)
-                    
+                    self._terminate(pid)
+                    self._forget_probe(port)
                     return not self.is_port_in_use(port)
                     
-                except subprocess.TimeoutExpired:
+                except psutil.NoSuchProcess:
+                    self._forget_probe(port)
+                    return not self.is_port_in_use(port)
+                except psutil.TimeoutExpired:
                     logger.error(f"Timeout killing process {pid}")
                     return False
                 except Exception as e:
@@ -108,8 +140,11 @@ class PortManager:
                 if force:
                     logger.warning(f"Force killing non-Python process {pid}: {command}")
                     try:
-                        subprocess.run(['kill', '-KILL', str(pid)], timeout=5)
-                        time.sleep(1)
+                        self._terminate(pid, graceful=False)
+                        self._forget_probe(port)
+                        return not self.is_port_in_use(port)
+                    except psutil.NoSuchProcess:
+                        self._forget_probe(port)
                         return not self.is_port_in_use(port)
                     except Exception as e:
                         logger.error(f"Error force killing process {pid}: {e}")
@@ -128,11 +163,15 @@ class PortManager:
         if start_port is None:
             start_port = self.preferred_port
             
-        for i in range(max_attempts):
-            port = start_port + i
-            if not self.is_port_in_use(port):
-                logger.info(f"Found available port: {port}")
-                return port
+        # Probe the whole range at once; the first free port in order wins
+        ports = range(start_port, start_port + max_attempts)
+        with ThreadPoolExecutor(max_workers=max(1, min(16, max_attempts))) as executor:
+            in_use = list(executor.map(self.is_port_in_use, ports))
+        
+        port = next((port for port, used in zip(ports, in_use) if not used), None)
+        if port is not None:
+            logger.info(f"Found available port: {port}")
+            return port
             
         logger.error(f"Could not find available port in range {start_port}-{start_port + max_attempts - 1}")
         return None
@@ -153,6 +192,7 @@ class PortManager:
             if self.kill_process_on_port(port, force=force_kill):
                 # Wait a moment for the port to be released
                 time.sleep(1)
+                self._forget_probe(port)
                 if not self.is_port_in_use(port):
                     logger.info(f"Successfully freed port {port}")
                     return port
@@ -176,45 +216,39 @@ class PortManager:
         if ports is None:
             ports = [7860, 7861, 7862, 7863, 7864, 7865]
         
-        report = {}
-        for port in ports:
+        def port_status(port: int) -> dict:
             is_used = self.is_port_in_use(port)
             process_info = self.get_process_using_port(port) if is_used else None
-            
-            report[port] = {
+            return {
                 'in_use': is_used,
                 'process': process_info
             }
-            
-        return report
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(ports)))) as executor:
+            return dict(zip(ports, executor.map(port_status, ports)))
     
     def cleanup_old_processes(self, max_age_minutes: int = 30) -> int:
         """Clean up old Python/Gradio processes that might be hanging"""
         try:
-            # Find Python processes with gradio or our app keywords
-            result = subprocess.run([
-                'ps', 'aux'
-            ], capture_output=True, text=True, timeout=10)
-            
-            if result.returncode != 0:
-                return 0
-            
             killed_count = 0
-            lines = result.stdout.split('\n')
+            own_pid = os.getpid()
+            cutoff = time.time() - max_age_minutes * 60
             
-            for line in lines:
-                if any(keyword in line.lower() for keyword in ['gradio', 'knowledge_worker', 'company_knowledge']):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        try:
-                            pid = int(parts[1])
-                            # Don't kill our own process
-                            if pid != os.getpid():
-                                logger.info(f"Cleaning up old process {pid}: {' '.join(parts[10:])}")
-                                subprocess.run(['kill', '-TERM', str(pid)], timeout=5)
-                                killed_count += 1
-                        except (ValueError, subprocess.TimeoutExpired):
-                            continue
+            # Find processes with gradio or our app keywords that have been running too long
+            for proc in psutil.process_iter(['pid', 'cmdline', 'create_time']):
+                info = proc.info
+                command = ' '.join(info['cmdline'] or ())
+                if not any(keyword in command.lower() for keyword in ['gradio', 'knowledge_worker', 'company_knowledge']):
+                    continue
+                # Don't kill our own process
+                if info['pid'] == own_pid or (info['create_time'] or cutoff) > cutoff:
+                    continue
+                try:
+                    logger.info(f"Cleaning up old process {info['pid']}: {command}")
+                    proc.terminate()
+                    killed_count += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
             
             if killed_count > 0:
                 time.sleep(2)  # Give processes time to exit
@@ -223,4 +257,4 @@ class PortManager:
             
         except Exception as e:
             logger.error(f"Error cleaning up old processes: {e}")
-            return 0
\ No newline at end of file
+            return 0
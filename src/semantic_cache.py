@@ -0,0 +1,225 @@
+"""
+Semantic query cache for Company Knowledge Worker
+"""
+
+import os
+import re
+import json
+import atexit
+import logging
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Questions that lean on earlier turns are answered fresh, never from a cache
+_FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|this|that|these|those|they|them|their|he|she|him|her|his|"
+    r"above|previous|earlier|more|else|again)\b",
+    re.IGNORECASE
+)
+
+# Additions between background writes of a persisted cache; the remainder is written at exit
+SAVE_EVERY = 16
+
+def is_follow_up(question: str) -> bool:
+    """Whether a question refers back to the conversation, so its answer depends on history"""
+    return _FOLLOW_UP_PATTERN.search(question) is not None
+
+class SemanticCache:
+    """Cache values by query embedding, matching on cosine similarity"""
+
+    def __init__(
+        self,
+        threshold: float,
+        persist_path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        version: Optional[str] = None
+    ):
+        self.threshold = threshold
+        self.persist_path = persist_path
+        self.max_entries = max_entries
+        # Version of the data the cached values were derived from; entries from another version are dropped
+        self.version = version
+        # Rows are unit-normalised query embeddings, parallel to self._values
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        # Last-use tick per row, for least-recently-used eviction once max_entries is reached
+        self._last_used: List[int] = []
+        self._tick = 0
+        self._lock = threading.Lock()
+        # Changes not yet written to disk, and a lock so only one write runs at a time
+        self._unsaved = 0
+        self._save_lock = threading.Lock()
+
+        if persist_path:
+            self._load()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def lookup(self, vector) -> Optional[Any]:
+        """Return the cached value for the most similar query, if it clears the threshold"""
+        query = self._normalize(vector)
+        with self._lock:
+            if not self._values:
+                return None
+            scores = self._vectors @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+                self._last_used[best] = self._next_tick()
+                return self._values[best]
+        return None
+
+    def add(self, vector, value: Any) -> None:
+        """Cache a value under a query embedding"""
+        row = self._normalize(vector)[np.newaxis, :]
+        with self._lock:
+            if self.max_entries and len(self._values) >= self.max_entries:
+                self._evict()
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._values.append(value)
+            self._last_used.append(self._next_tick())
+            save_now = self._mark_unsaved()
+        if save_now:
+            threading.Thread(target=self.flush, name="semantic-cache-save", daemon=True).start()
+
+    def set_version(self, version: Optional[str]) -> None:
+        """Drop every entry if the underlying data has changed version"""
+        with self._lock:
+            if version == self.version:
+                return
+            logger.info(f"Clearing semantic cache of {len(self._values)} entries for data version {version}")
+            self.version = version
+            self._vectors = None
+            self._values = []
+            self._last_used = []
+            self._mark_unsaved()
+
+    def flush(self) -> None:
+        """Write unsaved changes of a persisted cache to disk"""
+        # Snapshots are taken under the save lock, so an older one never overwrites a newer one
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                # Rows are replaced rather than modified in place, so these stay consistent after the lock
+                vectors, values, version = self._vectors, list(self._values), self.version
+                self._unsaved = 0
+            self._save(vectors, values, version)
+
+    def _mark_unsaved(self) -> bool:
+        """Count a change to persist, returning whether enough have built up to write now"""
+        if not self.persist_path:
+            return False
+        self._unsaved += 1
+        return self._unsaved >= SAVE_EVERY
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _next_tick(self) -> int:
+        self._tick += 1
+        return self._tick
+
+    def _evict(self) -> None:
+        """Drop the least recently used entry"""
+        oldest = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+        self._vectors = np.delete(self._vectors, oldest, axis=0)
+        del self._values[oldest]
+        del self._last_used[oldest]
+
+    def _load(self) -> None:
+        """Load a previously persisted cache, if one exists"""
+        vectors_file = f"{self.persist_path}.npy"
+        values_file = f"{self.persist_path}.json"
+        if not (os.path.exists(vectors_file) and os.path.exists(values_file)):
+            return
+        try:
+            with open(values_file, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if not isinstance(stored, dict) or stored.get("version") != self.version:
+                logger.info("Discarding semantic cache built from another data version")
+                return
+            values = stored["values"]
+            if not values:
+                return
+            vectors = np.load(vectors_file)
+            if self.max_entries:
+                vectors, values = vectors[-self.max_entries:], values[-self.max_entries:]
+            if len(vectors) == len(values):
+                self._vectors, self._values = vectors, values
+                self._last_used = [self._next_tick() for _ in values]
+                logger.info(f"Loaded semantic cache with {len(values)} entries")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {e}")
+
+    def _save(self, vectors: Optional[np.ndarray], values: List[Any], version: Optional[str]) -> None:
+        """Persist a snapshot of the cache to disk, replacing the previous files"""
+        vectors_file = f"{self.persist_path}.npy"
+        values_file = f"{self.persist_path}.json"
+        try:
+            os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
+            if vectors is None:
+                vectors = np.empty((0, 0), dtype=np.float32)
+            with open(f"{vectors_file}.tmp", "wb") as f:
+                np.save(f, vectors)
+            with open(f"{values_file}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"version": version, "values": values}, f)
+            os.replace(f"{vectors_file}.tmp", vectors_file)
+            os.replace(f"{values_file}.tmp", values_file)
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {e}")
+
+
+class CentroidCache:
+    """Cache values per cluster of similar queries, matching on cosine similarity to cluster centroids"""
+
+    def __init__(self, hit_threshold: float, new_cluster_threshold: float, merge_rate: float = 0.1):
+        self.hit_threshold = hit_threshold
+        self.new_cluster_threshold = new_cluster_threshold
+        self.merge_rate = merge_rate
+        # Rows are unit-normalised cluster centroids, parallel to self._values
+        self._centroids: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _nearest(self, query: np.ndarray):
+        if not self._values:
+            return None, -1.0
+        scores = self._centroids @ query
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def lookup(self, vector) -> Optional[Any]:
+        """Return the value of the nearest cluster, if its centroid clears the hit threshold"""
+        query = SemanticCache._normalize(vector)
+        with self._lock:
+            best, score = self._nearest(query)
+            if best is not None and score > self.hit_threshold:
+                logger.debug(f"Centroid cache hit (similarity {score:.3f})")
+                return self._values[best]
+        return None
+
+    def add(self, vector, value: Any) -> None:
+        """Start a new cluster for a distant query, or pull the nearest centroid towards it"""
+        query = SemanticCache._normalize(vector)
+        with self._lock:
+            best, score = self._nearest(query)
+            if best is None or score < self.new_cluster_threshold:
+                row = query[np.newaxis, :]
+                self._centroids = row if self._centroids is None else np.vstack([self._centroids, row])
+                self._values.append(value)
+                return
+            centroid = (1 - self.merge_rate) * self._centroids[best] + self.merge_rate * query
+            self._centroids[best] = SemanticCache._normalize(centroid)
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -3,58 +3,158 @@ Vector store management for Company Knowledge Worker
 """
 
 import os
+import json
+import uuid
+import queue
+import asyncio
+import sqlite3
+import shutil
+import hashlib
 import logging
-from typing import List, Optional
+import threading
+from collections import Counter, defaultdict
+from contextlib import closing
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import numpy as np
+import chromadb
+from chromadb.config import Settings
 
 from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
+from langchain_core.vectorstores import VectorStoreRetriever
 
 from .config import config
+from .embedding_cache import EmbeddingCache
+from .batched_embeddings import BatchedQueryEmbeddings, unit_vectors
 
 logger = logging.getLogger(__name__)
 
+# Rows per collection.add; one SQLite transaction and index update each
+CHROMA_BATCH_SIZE = 200
+
+# Embedded groups waiting for insertion while the next group is embedded
+INSERT_QUEUE_SIZE = 4
+
+# LangChain's default collection name, so existing databases keep opening
+COLLECTION_NAME = "langchain"
+
+# Rows fetched per collection.get when reading the whole collection
+GET_PAGE_SIZE = 10000
+
+# Unit-vector components are stored as int8 multiples of 1/QUANT_SCALE
+QUANT_SCALE = 127
+
+def _batched(items: Iterable, batch_size: int) -> Iterator[list]:
+    """Yield successive lists of at most batch_size items"""
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+def quantize_int8(vectors) -> np.ndarray:
+    """Quantize unit-length vectors to int8"""
+    return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) * QUANT_SCALE), -128, 127).astype(np.int8)
+
+def quantized_scores(quantized: np.ndarray, query_vector) -> np.ndarray:
+    """Approximate inner products of a query with int8 rows, accumulated in int32 a page at a time"""
+    query = quantize_int8(query_vector).astype(np.int32)
+    scores = np.empty(len(quantized), dtype=np.float32)
+    for start in range(0, len(quantized), GET_PAGE_SIZE):
+        chunk = quantized[start:start + GET_PAGE_SIZE]
+        scores[start:start + len(chunk)] = chunk.astype(np.int32) @ query
+    return scores / (QUANT_SCALE * QUANT_SCALE)
+
+@lru_cache(maxsize=None)
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived event loop for sync callers, so shared async HTTP clients stay bound to one loop"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="async-client-loop", daemon=True).start()
+    return loop
+
+@lru_cache(maxsize=None)
+def get_embeddings() -> BatchedQueryEmbeddings:
+    """Query-batching embeddings shared by every VectorStoreManager, created on first use"""
+    # Sync calls reuse the shared pooled client; the async client is created
+    # once with the embeddings, so async batches all run on background_loop().
+    # Concurrent query embeddings from different users are coalesced into a
+    # single request, and query vectors are kept in the on-disk embedding
+    # cache across restarts.
+    return BatchedQueryEmbeddings(
+        OpenAIEmbeddings(model=config.EMBED_MODEL, http_client=config.get_http_client()),
+        max_batch=config.QUERY_BATCH_SIZE,
+        max_wait=config.QUERY_BATCH_WAIT_MS / 1000,
+        persistent_cache=EmbeddingCache(config.EMBED_CACHE_DIR, config.EMBED_MODEL),
+        normalize=True
+    )
+
 class VectorStoreManager:
     """Manages ChromaDB vector store operations"""
     
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
+        # Managers share one embeddings client, batcher and query cache
+        self.embeddings = get_embeddings()
+        self.embedding_cache = self.embeddings.persistent_cache
         self.db_path = config.get_vector_db_path()
         self.vectorstore: Optional[Chroma] = None
+        # Chroma client and collection behind the vector store, opened with it
+        self._client: Optional[chromadb.ClientAPI] = None
+        self.collection: Optional[chromadb.Collection] = None
+        # Retrievers by serialized search kwargs, valid for the store they were built on
+        self._retrievers: Dict[str, VectorStoreRetriever] = {}
+        self._retrievers_store: Optional[Chroma] = None
         
-    def create_vectorstore(self, documents: List[Document], force_recreate: bool = False) -> Chroma:
-        """Create or load vector store from documents"""
+    def start_warmup(self) -> threading.Thread:
+        """Open the OpenAI connection in the background with a throwaway embedding request"""
+        def warmup():
+            try:
+                # Straight to the API: the query caches would answer it without opening a connection
+                self.embeddings.base.embed_documents(["warmup"])
+                logger.info("Embedding connection warmed up")
+            except Exception as e:
+                logger.debug(f"Embedding warmup failed: {e}")
+        
+        thread = threading.Thread(target=warmup, name="embedding-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def create_vectorstore(self, documents: List[Document], force_recreate: bool = False, batch_size: Optional[int] = None,
+                           files: Optional[list] = None) -> Chroma:
+        """Create or load vector store from documents, recording the stats of the walked source files"""
+        if batch_size is None:
+            batch_size = config.EMBED_BATCH_SIZE
         
         # Delete existing database if it exists and force_recreate is True
         if force_recreate and os.path.exists(self.db_path):
-            try:
-                existing_store = Chroma(persist_directory=self.db_path, embedding_function=self.embeddings)
-                existing_store.delete_collection()
-                logger.info("Deleted existing vector database")
-            except Exception as e:
-                logger.warning(f"Could not delete existing database: {e}")
+            if self._client is not None:
+                # Chroma keeps the open client for this path, so drop the collection through it
+                try:
+                    self._client.delete_collection(COLLECTION_NAME)
+                    logger.info("Deleted existing vector database")
+                except Exception as e:
+                    logger.warning(f"Could not delete existing database: {e}")
+            else:
+                # Nothing is open yet, so remove the files rather than loading the index just to drop it
+                shutil.rmtree(self.db_path, ignore_errors=True)
+                logger.info("Purged existing vector database directory")
         
         # Create vectorstore from documents
         logger.info(f"Creating embeddings and storing in Chroma database at {self.db_path}...")
         
         try:
-            self.vectorstore = Chroma.from_documents(
-                documents=documents, 
-                embedding=self.embeddings, 
-                persist_directory=self.db_path
-            )
+            self._open_vectorstore(self._collection_metadata())
             
-            # Get collection info
-            collection = self.vectorstore._collection
-            count = collection.count()
+            # Count and dimensions are known from the insert itself, so no extra queries
+            dimensions = self._add_documents(documents, batch_size)
+            self._write_manifest(self._build_manifest(documents, files))
+            count = len(documents)
             
             logger.info(f"Vectorstore created with {count} document chunks")
             
             # Get embedding dimensions for info
             if count > 0:
-                sample_embedding = collection.get(limit=1, include=["embeddings"])["embeddings"][0]
-                dimensions = len(sample_embedding)
                 logger.info(f"Vector store contains {count:,} vectors with {dimensions:,} dimensions")
             
             return self.vectorstore
@@ -63,18 +163,246 @@ class VectorStoreManager:
             logger.error(f"Error creating vector store: {e}")
             raise
     
+    def sync(self, documents: List[Document], batch_size: Optional[int] = None,
+             files: Optional[list] = None, reloaded: Optional[Set[str]] = None) -> Chroma:
+        """Incrementally update the vector store, re-embedding only new or changed source files
+        
+        files are all walked source files (with path, size and mtime_ns). When reloaded is given,
+        documents only cover those paths; other walked files keep their chunks and manifest entries.
+        """
+        if not self.vectorstore:
+            raise ValueError("Vector store not initialized. Call load_existing_vectorstore first.")
+        if batch_size is None:
+            batch_size = config.EMBED_BATCH_SIZE
+        
+        previous = self._read_manifest()
+        if previous is None:
+            logger.info("No vector store manifest found, performing a full rebuild")
+            return self.create_vectorstore(documents, force_recreate=True, batch_size=batch_size, files=files)
+        
+        unchanged = {}
+        if reloaded is not None:
+            # Compare only the reloaded files and sources that are no longer on disk
+            walked = {file.path for file in files or ()}
+            considered = set(reloaded) | (previous.keys() - walked)
+            unchanged = {source: entry for source, entry in previous.items() if source not in considered}
+            previous = {source: entry for source, entry in previous.items() if source in considered}
+            files = [file for file in files or () if file.path in reloaded]
+        
+        current = self._build_manifest(documents, files)
+        new_sources = current.keys() - previous.keys()
+        deleted_sources = previous.keys() - current.keys()
+        changed_sources = {
+            source for source in current.keys() & previous.keys()
+            if current[source]["sha1"] != previous[source]["sha1"]
+        }
+        logger.info(
+            f"Vector store sync: {len(new_sources)} new, {len(changed_sources)} changed, "
+            f"{len(deleted_sources)} deleted source files"
+        )
+        
+        try:
+            # Drop stale chunks, then embed and add chunks for new/changed files
+            stale_sources = list(deleted_sources | changed_sources)
+            for batch in _batched(stale_sources, 100):
+                self.collection.delete(where={"source": {"$in": batch}})
+            
+            refresh_sources = new_sources | changed_sources
+            refreshed = [doc for doc in documents if doc.metadata.get("source") in refresh_sources]
+            if refreshed:
+                self._add_documents(refreshed, batch_size)
+            
+            self._write_manifest({**unchanged, **current})
+            logger.info(f"Vector store synced: {len(refreshed)} chunks re-embedded")
+            return self.vectorstore
+            
+        except Exception as e:
+            logger.error(f"Error syncing vector store: {e}")
+            raise
+    
+    def _add_documents(self, documents: List[Document], batch_size: int) -> int:
+        """Embed documents and add them to the collection, returning the embedding dimensions"""
+        # Embed chunks group by group (reusing cached vectors for unchanged text)
+        # while a consumer thread adds the previous groups' precomputed vectors,
+        # so embedding requests and Chroma inserts overlap
+        group_size = batch_size * config.EMBED_CONCURRENCY
+        pending = queue.Queue(maxsize=INSERT_QUEUE_SIZE)
+        insert_failed = threading.Event()
+        dimensions = 0
+        
+        def insert_worker():
+            error = None
+            # Keep draining after a failure so the producer never blocks on a full queue
+            while (item := pending.get()) is not None:
+                if error is None:
+                    try:
+                        self._insert_vectors(*item)
+                    except Exception as e:
+                        error = e
+                        insert_failed.set()
+            if error is not None:
+                raise error
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-insert") as executor:
+            consumer = executor.submit(insert_worker)
+            try:
+                for group in _batched(documents, group_size):
+                    if insert_failed.is_set():
+                        break
+                    texts = [doc.page_content for doc in group]
+                    # Unit vectors let the collection rank by inner product instead of cosine
+                    vectors = unit_vectors(self._embed_with_cache(texts, batch_size))
+                    if vectors and not dimensions:
+                        dimensions = len(vectors[0])
+                    pending.put((texts, vectors, [doc.metadata for doc in group]))
+            finally:
+                pending.put(None)
+            consumer.result()
+        
+        return dimensions
+    
+    def _insert_vectors(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict]) -> None:
+        """Add precomputed vectors to the collection instead of letting Chroma re-embed"""
+        # Inserts are batched independently of the embedding request size
+        for start in range(0, len(texts), CHROMA_BATCH_SIZE):
+            end = start + CHROMA_BATCH_SIZE
+            self.collection.add(
+                ids=[str(uuid.uuid4()) for _ in range(start, min(end, len(texts)))],
+                embeddings=vectors[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end]
+            )
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.db_path, "manifest.json")
+    
+    def index_version(self) -> Optional[str]:
+        """Version of the indexed documents, changing whenever the store is rebuilt or synced"""
+        try:
+            stat = os.stat(self._manifest_path())
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def _build_manifest(self, documents: List[Document], files: Optional[list] = None) -> Dict[str, dict]:
+        """Build a {source path: {mtime, mtime_ns, size, sha1}} manifest from document chunks
+        
+        Walked files without chunks are recorded too (with no sha1), so their stats show they were seen.
+        """
+        hashers = defaultdict(hashlib.sha1)
+        for doc in documents:
+            hashers[doc.metadata.get("source", "unknown")].update(doc.page_content.encode("utf-8"))
+        
+        stats = {file.path: (file.size, file.mtime_ns) for file in files or ()}
+        manifest = {}
+        for source in stats.keys() | hashers.keys():
+            if source in stats:
+                size, mtime_ns = stats[source]
+            else:
+                try:
+                    source_stat = os.stat(source)
+                    size, mtime_ns = source_stat.st_size, source_stat.st_mtime_ns
+                except OSError:
+                    size, mtime_ns = None, None
+            hasher = hashers.get(source)
+            manifest[source] = {
+                "mtime": mtime_ns / 1e9 if mtime_ns is not None else None,
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "sha1": hasher.hexdigest() if hasher is not None else None
+            }
+        return manifest
+    
+    def changed_files(self, files: list) -> Tuple[list, Set[str]]:
+        """Split walked files against the manifest into (new or modified files, removed source paths)"""
+        previous = self._read_manifest()
+        if previous is None:
+            return list(files), set()
+        
+        changed = []
+        for file in files:
+            entry = previous.get(file.path)
+            if entry is None or entry.get("size") != file.size or entry.get("mtime_ns") != file.mtime_ns:
+                changed.append(file)
+        removed = previous.keys() - {file.path for file in files}
+        return changed, removed
+    
+    def _read_manifest(self) -> Optional[Dict[str, dict]]:
+        """Read the stored manifest, if any"""
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read vector store manifest: {e}")
+            return None
+    
+    def _write_manifest(self, manifest: Dict[str, dict]) -> None:
+        """Persist the manifest next to the Chroma database"""
+        try:
+            with open(self._manifest_path(), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+        except Exception as e:
+            logger.warning(f"Could not write vector store manifest: {e}")
+    
+    def _collection_metadata(self) -> dict:
+        """HNSW settings for new collections; search ef scales with the retrieval k"""
+        return {
+            "hnsw:space": "ip",
+            "hnsw:M": config.HNSW_M,
+            "hnsw:construction_ef": config.HNSW_EF_CONSTRUCTION,
+            "hnsw:search_ef": max(config.HNSW_EF_SEARCH, config.RETRIEVAL_K * 4)
+        }
+    
+    def _embed_with_cache(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        """Embed texts, only calling the embedding API for texts not already cached"""
+        keys = [self.embedding_cache.key_for(text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+        
+        miss_indices = [i for i, key in enumerate(keys) if key not in cached]
+        logger.info(f"Embedding cache: {len(texts) - len(miss_indices)} hits, {len(miss_indices)} misses")
+        
+        if miss_indices:
+            # The shared async client's pooled connections belong to one loop, so every group runs on it
+            miss_vectors = asyncio.run_coroutine_threadsafe(self._embed_all_async(
+                [texts[i] for i in miss_indices], batch_size, config.EMBED_CONCURRENCY
+            ), background_loop()).result()
+            new_entries = {keys[i]: vector for i, vector in zip(miss_indices, miss_vectors)}
+            self.embedding_cache.set_many(new_entries.items())
+            cached.update(new_entries)
+        
+        return [cached[key] for key in keys]
+    
+    async def _embed_all_async(self, texts: List[str], batch_size: int, concurrency: int) -> List[List[float]]:
+        """Embed texts using concurrent batched requests, returning vectors in input order"""
+        # Sort by length so each batch packs similarly sized inputs
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches = list(_batched(order, batch_size))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _embed_batch(indices: List[int]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embeddings.aembed_documents([texts[i] for i in indices])
+        
+        logger.info(f"Embedding {len(texts)} chunks in {len(batches)} batches ({concurrency} concurrent requests)")
+        results = await asyncio.gather(*[_embed_batch(batch) for batch in batches])
+        
+        # Restore the original order
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for indices, batch_vectors in zip(batches, results):
+            for index, vector in zip(indices, batch_vectors):
+                vectors[index] = vector
+        return vectors
+    
     def load_existing_vectorstore(self) -> Optional[Chroma]:
         """Load existing vector store if it exists"""
         if os.path.exists(self.db_path):
             try:
-                self.vectorstore = Chroma(
-                    persist_directory=self.db_path, 
-                    embedding_function=self.embeddings
-                )
+                self._open_vectorstore()
                 
                 # Verify it has content
-                collection = self.vectorstore._collection
-                count = collection.count()
+                count = self.collection.count()
                 
                 if count > 0:
                     logger.info(f"Loaded existing vector store with {count} document chunks")
@@ -90,11 +418,24 @@ class VectorStoreManager:
             logger.info(f"No existing vector store found at {self.db_path}")
             return None
     
+    def _open_vectorstore(self, collection_metadata: Optional[dict] = None) -> Chroma:
+        """Open the LangChain store and its underlying collection on one persistent client"""
+        if self._client is None:
+            self._client = chromadb.PersistentClient(path=self.db_path, settings=Settings(anonymized_telemetry=False))
+        self.vectorstore = Chroma(
+            client=self._client,
+            collection_name=COLLECTION_NAME,
+            embedding_function=self.embeddings,
+            collection_metadata=collection_metadata
+        )
+        self.collection = self._client.get_collection(COLLECTION_NAME)
+        return self.vectorstore
+    
     def get_vectorstore(self) -> Optional[Chroma]:
         """Get the current vector store instance"""
         return self.vectorstore
     
-    def create_retriever(self, search_kwargs: dict = None):
+    def create_retriever(self, search_kwargs: dict = None, search_type: str = "similarity"):
         """Create a retriever from the vector store"""
         if not self.vectorstore:
             raise ValueError("Vector store not initialized. Call create_vectorstore or load_existing_vectorstore first.")
@@ -102,8 +443,20 @@ class VectorStoreManager:
         if search_kwargs is None:
             search_kwargs = {"k": config.RETRIEVAL_K}
         
-        retriever = self.vectorstore.as_retriever(search_kwargs=search_kwargs)
-        logger.info(f"Created retriever with search kwargs: {search_kwargs}")
+        if search_type == "mmr" and "fetch_k" not in search_kwargs:
+            # Diversify over twice as many candidates as are returned
+            search_kwargs = {**search_kwargs, "fetch_k": 2 * search_kwargs.get("k", config.RETRIEVAL_K)}
+        
+        if self._retrievers_store is not self.vectorstore:
+            self._retrievers = {}
+            self._retrievers_store = self.vectorstore
+        
+        key = json.dumps([search_type, search_kwargs], sort_keys=True, default=str)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            retriever = self.vectorstore.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+            self._retrievers[key] = retriever
+            logger.info(f"Created {search_type} retriever with search kwargs: {search_kwargs}")
         
         return retriever
     
@@ -113,20 +466,52 @@ class VectorStoreManager:
             raise ValueError("Vector store not initialized")
         
         try:
-            collection = self.vectorstore._collection
-            result = collection.get(include=['embeddings', 'documents', 'metadatas'])
+            collection = self.collection
+            count = collection.count()
+            
+            # Vectors come from an on-disk memmap when it matches the collection;
+            # otherwise they are streamed page by page into a new one
+            vectors = self._open_vector_cache(count)
+            include = ['documents', 'metadatas'] if vectors is not None else ['embeddings', 'documents', 'metadatas']
+            cache_file = self._vector_cache_path()
+            writer = None
+            documents = []
+            metadatas = []
+            for offset in range(0, count, GET_PAGE_SIZE):
+                page = collection.get(limit=GET_PAGE_SIZE, offset=offset, include=include)
+                if vectors is None:
+                    page_vectors = np.asarray(page['embeddings'], dtype=np.float32)
+                    if writer is None:
+                        writer = np.lib.format.open_memmap(
+                            f"{cache_file}.tmp", mode='w+', dtype=np.float32, shape=(count, page_vectors.shape[1])
+                        )
+                    writer[offset:offset + len(page_vectors)] = page_vectors
+                    # Release this page's vectors before fetching the next one
+                    del page_vectors
+                    page['embeddings'] = None
+                documents.extend(page['documents'])
+                metadatas.extend(page['metadatas'])
+                del page
             
-            vectors = np.array(result['embeddings'])
-            documents = result['documents']
-            metadatas = result['metadatas']
-            doc_types = [metadata.get('doc_type', 'unknown') for metadata in metadatas]
+            if writer is not None:
+                writer.flush()
+                del writer
+                os.replace(f"{cache_file}.tmp", cache_file)
+                vectors = np.load(cache_file, mmap_mode='r')
+            elif vectors is None:
+                vectors = np.empty((0, 0), dtype=np.float32)
+            
+            doc_types = np.fromiter(
+                (metadata.get('doc_type', 'unknown') for metadata in metadatas), dtype=object, count=len(metadatas)
+            )
             
             logger.info(f"Retrieved {len(vectors)} vectors for visualization")
             
             return {
                 'vectors': vectors,
-                'documents': documents,
-                'metadatas': metadatas,
+                'quantized_vectors': self._quantized_vectors(vectors),
+                'documents': tuple(documents),
+                'metadatas': tuple(metadatas),
                 'doc_types': doc_types
             }
             
@@ -134,6 +519,73 @@ class VectorStoreManager:
             logger.error(f"Error getting visualization data: {e}")
             raise
     
+    def _vector_cache_path(self) -> str:
+        return os.path.join(self.db_path, "vectors.f32.npy")
+    
+    def _open_vector_cache(self, count: int) -> Optional[np.ndarray]:
+        """Open the cached vector matrix read-only, if it is still current for the collection"""
+        cache_file = self._vector_cache_path()
+        try:
+            # The manifest is rewritten on every create/sync, so an older cache is stale
+            manifest_file = self._manifest_path()
+            if os.path.exists(manifest_file) and os.path.getmtime(cache_file) < os.path.getmtime(manifest_file):
+                return None
+            vectors = np.load(cache_file, mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not open vector cache: {e}")
+            return None
+        
+        if len(vectors) != count or count == 0:
+            return None
+        logger.info(f"Using cached vector matrix {cache_file}")
+        return vectors
+    
+    def _quantized_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """Int8 copy of the vector matrix for coarse scans, kept as a memmap next to the float one"""
+        quantized_file = os.path.join(self.db_path, "vectors.i8.npy")
+        try:
+            if os.path.getmtime(quantized_file) >= os.path.getmtime(self._vector_cache_path()):
+                quantized = np.load(quantized_file, mmap_mode='r')
+                if quantized.shape == vectors.shape:
+                    return quantized
+        except OSError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not open quantized vector cache: {e}")
+        
+        if len(vectors) == 0:
+            return np.empty(vectors.shape, dtype=np.int8)
+        
+        writer = np.lib.format.open_memmap(f"{quantized_file}.tmp", mode='w+', dtype=np.int8, shape=vectors.shape)
+        for start in range(0, len(vectors), GET_PAGE_SIZE):
+            writer[start:start + GET_PAGE_SIZE] = quantize_int8(vectors[start:start + GET_PAGE_SIZE])
+        writer.flush()
+        del writer
+        os.replace(f"{quantized_file}.tmp", quantized_file)
+        logger.info(f"Wrote quantized vector matrix {quantized_file}")
+        return np.load(quantized_file, mmap_mode='r')
+    
+    def get_chunks_by_filter(self, where: dict) -> dict:
+        """Get documents and metadatas for chunks matching a metadata filter"""
+        if not self.vectorstore:
+            raise ValueError("Vector store not initialized")
+        
+        try:
+            # Embeddings are not needed here, so skip transferring them
+            result = self.collection.get(where=where, include=['documents', 'metadatas'])
+            logger.info(f"Retrieved {len(result['ids'])} chunks matching filter {where}")
+            
+            return {
+                'documents': result['documents'],
+                'metadatas': result['metadatas']
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting chunks by filter: {e}")
+            raise
+    
     def search_similar_documents(self, query: str, k: int = 5):
         """Search for similar documents"""
         if not self.vectorstore:
@@ -148,13 +600,27 @@ class VectorStoreManager:
             logger.error(f"Error searching similar documents: {e}")
             raise
     
+    def search_similar_documents_by_vector(self, query_vector: List[float], k: int = 5):
+        """Search for documents similar to an already embedded query"""
+        if not self.vectorstore:
+            raise ValueError("Vector store not initialized")
+        
+        try:
+            results = self.vectorstore.similarity_search_by_vector(query_vector, k=k)
+            logger.info(f"Found {len(results)} similar documents for query vector")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching similar documents by vector: {e}")
+            raise
+    
     def get_stats(self) -> dict:
         """Get vector store statistics"""
         if not self.vectorstore:
             return {"error": "Vector store not initialized"}
         
         try:
-            collection = self.vectorstore._collection
+            collection = self.collection
             count = collection.count()
             
             # Get sample data to determine dimensions
@@ -162,16 +628,21 @@ class VectorStoreManager:
             
             stats = {
                 "total_documents": count,
-                "embedding_dimensions": len(sample_data["embeddings"][0]) if sample_data["embeddings"] else 0,
+                "embedding_dimensions": len(sample_data["embeddings"][0]) if len(sample_data["embeddings"]) else 0,
                 "database_path": self.db_path
             }
             
-            # Get document type breakdown
-            all_metadata = collection.get(include=["metadatas"])["metadatas"]
-            doc_types = {}
-            for metadata in all_metadata:
-                doc_type = metadata.get('doc_type', 'unknown')
-                doc_types[doc_type] = doc_types.get(doc_type, 0) + 1
+            # Get document type breakdown, aggregated in SQLite where possible
+            doc_types = self._doc_type_counts_sql(str(collection.id), count)
+            if doc_types is None:
+                # Scan the metadata a page at a time rather than loading it all at once
+                counter = Counter()
+                for offset in range(0, count, GET_PAGE_SIZE):
+                    page = collection.get(limit=GET_PAGE_SIZE, offset=offset, include=["metadatas"])["metadatas"]
+                    if not page:
+                        break
+                    counter.update(metadata.get('doc_type', 'unknown') for metadata in page)
+                doc_types = dict(counter)
             
             stats["doc_type_breakdown"] = doc_types
             
@@ -179,4 +650,28 @@ class VectorStoreManager:
             
         except Exception as e:
             logger.error(f"Error getting vector store stats: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+    
+    def _doc_type_counts_sql(self, collection_id: str, count: int) -> Optional[Dict[str, int]]:
+        """Count chunks per doc_type with a GROUP BY on Chroma's SQLite metadata table"""
+        db_file = os.path.join(self.db_path, "chroma.sqlite3")
+        try:
+            with closing(sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)) as conn:
+                rows = conn.execute(
+                    "SELECT em.string_value, COUNT(*) FROM embedding_metadata em "
+                    "JOIN embeddings e ON e.id = em.id "
+                    "JOIN segments s ON s.id = e.segment_id "
+                    "WHERE s.collection = ? AND em.key = 'doc_type' AND em.string_value IS NOT NULL "
+                    "GROUP BY em.string_value",
+                    (collection_id,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            # Unexpected schema (or no file yet); let the caller scan the metadata instead
+            logger.debug(f"SQL doc_type aggregation unavailable: {e}")
+            return None
+        
+        doc_types = dict(rows)
+        missing = count - sum(doc_types.values())
+        if missing > 0:
+            doc_types['unknown'] = doc_types.get('unknown', 0) + missing
+        return doc_types
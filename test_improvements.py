@@ -4,26 +4,43 @@ Test script to validate the RAG improvements
 """
 
 import sys
+from collections import Counter
+from functools import cache
 sys.path.insert(0, 'src')
 
+import numpy as np
+
 from src.config import config
-from src.vector_store import VectorStoreManager
+from src.vector_store import VectorStoreManager, quantized_scores
 from src.improved_rag import ImprovedRAGPipeline
 
-def test_improved_rag():
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the k highest scores, best first, without a full sort"""
+    if len(scores) <= k:
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+@cache
+def _setup(db_path: str):
+    """Load the vector store once per database, shared by every test below"""
+    print("🔧 Initializing vector store manager...")
+    vector_store_manager = VectorStoreManager()
+    if not vector_store_manager.load_existing_vectorstore():
+        return None
+    return vector_store_manager
+
+def test_improved_rag(vector_store_manager=None):
     """Test the improved RAG pipeline"""
     
     print("🧪 TESTING IMPROVED RAG PIPELINE")
     print("="*50)
     
     try:
-        # Initialize components
-        print("🔧 Initializing vector store manager...")
-        vector_store_manager = VectorStoreManager()
-        
         # Load existing vector store
-        vectorstore = vector_store_manager.load_existing_vectorstore()
-        if not vectorstore:
+        if vector_store_manager is None:
+            vector_store_manager = _setup(config.get_vector_db_path())
+        if not vector_store_manager:
             print("❌ No existing vector store found! Please run the app first to build it.")
             return
         
@@ -34,9 +51,15 @@ def test_improved_rag():
         improved_rag = ImprovedRAGPipeline(vector_store_manager)
         print("✅ Improved RAG pipeline ready")
         
+        test_question = "What projects is the company currently working on? List all projects with details."
+        specific_question = "Tell me about the SQL Server upgrade project"
+        regular_question = "What contracts does the company have?"
+        
+        # Embed all test questions in one request; the pipeline's embed_query calls reuse them
+        vector_store_manager.embeddings.prime([test_question, specific_question, regular_question])
+        
         # Test comprehensive project query
         print("\n🔍 Testing comprehensive project query...")
-        test_question = "What projects is the company currently working on? List all projects with details."
         
         result = improved_rag.ask_question(test_question)
         
@@ -49,7 +72,6 @@ def test_improved_rag():
         # Test specific project query
         print("\n" + "="*50)
         print("🔍 Testing specific project query...")
-        specific_question = "Tell me about the SQL Server upgrade project"
         
         result2 = improved_rag.ask_question(specific_question)
         
@@ -61,7 +83,6 @@ def test_improved_rag():
         # Test regular query
         print("\n" + "="*50)
         print("🔍 Testing regular query...")
-        regular_question = "What contracts does the company have?"
         
         result3 = improved_rag.ask_question(regular_question)
         
@@ -78,45 +99,61 @@ def test_improved_rag():
         import traceback
         traceback.print_exc()
 
-def compare_retrieval_methods():
+def compare_retrieval_methods(vector_store_manager=None):
     """Compare standard vs improved retrieval"""
     
     print("\n🔄 COMPARING RETRIEVAL METHODS")
     print("="*50)
     
     try:
-        vector_store_manager = VectorStoreManager()
-        vectorstore = vector_store_manager.load_existing_vectorstore()
+        if vector_store_manager is None:
+            vector_store_manager = _setup(config.get_vector_db_path())
         
-        if not vectorstore:
+        if not vector_store_manager:
             print("❌ No vector store available")
             return
         
         test_query = "What projects is the company working on?"
         
+        # Embed and search once at the largest k; the k=10 results are its prefix
+        query_vector = vector_store_manager.embeddings.embed_query(test_query)
+        enhanced_results = vector_store_manager.search_similar_documents_by_vector(query_vector, k=25)
+        
         # Standard retrieval (k=10)
-        print(f"🔍 Standard retrieval (k=10):")
-        standard_results = vector_store_manager.search_similar_documents(test_query, k=10)
+        print("🔍 Standard retrieval (k=10):")
+        standard_results = enhanced_results[:10]
         
-        projects_standard = {}
-        for doc in standard_results:
-            project = doc.metadata.get('project', 'Unknown')
-            projects_standard[project] = projects_standard.get(project, 0) + 1
+        projects_standard = dict(Counter(doc.metadata.get('project', 'Unknown') for doc in standard_results))
         
         print(f"  Projects found: {projects_standard}")
         
         # Enhanced retrieval (k=25) 
-        print(f"\n🔍 Enhanced retrieval (k=25):")
-        enhanced_results = vector_store_manager.search_similar_documents(test_query, k=25)
+        print("\n🔍 Enhanced retrieval (k=25):")
         
-        projects_enhanced = {}
-        for doc in enhanced_results:
-            project = doc.metadata.get('project', 'Unknown')
-            projects_enhanced[project] = projects_enhanced.get(project, 0) + 1
+        projects_enhanced = dict(Counter(doc.metadata.get('project', 'Unknown') for doc in enhanced_results))
         
         print(f"  Projects found: {projects_enhanced}")
         
-        print(f"\n📊 Improvement:")
+        # Coarse scan over the int8 copy of every stored vector (k=25)
+        print("\n🔍 Int8 coarse scan (k=25):")
+        data = vector_store_manager.get_visualization_data()
+        coarse_top = _top_k(quantized_scores(data['quantized_vectors'], query_vector), 25)
+        projects_coarse = dict(Counter(data['metadatas'][i].get('project', 'Unknown') for i in coarse_top))
+        
+        print(f"  Projects found: {projects_coarse}")
+        
+        # Exact top-k with one matmul over the float vectors, as ground truth for both
+        print("\n🎯 Exact scan (k=25):")
+        exact_top = _top_k(data['vectors'] @ np.asarray(query_vector, dtype=np.float32), 25)
+        exact_contents = {data['documents'][i] for i in exact_top}
+        
+        if exact_contents:
+            hnsw_recall = len(exact_contents & {doc.page_content for doc in enhanced_results}) / len(exact_contents)
+            coarse_recall = len(exact_contents & {data['documents'][i] for i in coarse_top}) / len(exact_contents)
+            print(f"  HNSW recall@25: {hnsw_recall:.0%}")
+            print(f"  Int8 recall@25: {coarse_recall:.0%}")
+        
+        print("\n📊 Improvement:")
         print(f"  Standard: {len(projects_standard)} unique projects")
         print(f"  Enhanced: {len(projects_enhanced)} unique projects")
         print(f"  Gain: +{len(projects_enhanced) - len(projects_standard)} projects")
@@ -125,5 +162,6 @@ def compare_retrieval_methods():
         print(f"❌ Comparison failed: {e}")
 
 if __name__ == "__main__":
-    test_improved_rag()
-    compare_retrieval_methods()
\ No newline at end of file
+    vector_store_manager = _setup(config.get_vector_db_path())
+    test_improved_rag(vector_store_manager)
+    compare_retrieval_methods(vector_store_manager)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Tests for document loading
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("BASE_PATH", tempfile.gettempdir())
+
+import openpyxl
+import pandas as pd
+from pypdf import PdfWriter
+
+from src import document_loader
+
+
+class _UnextractablePage:
+    number = 0
+
+    def get_text(self, kind):
+        raise RuntimeError("cannot extract text")
+
+
+class _UnextractablePdf:
+    """PyMuPDF document stand-in that opens fine but fails on text extraction"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        return iter([_UnextractablePage()])
+
+
+class PdfLoadingTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.pdf_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(handle)
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        writer.add_blank_page(width=200, height=200)
+        with open(self.pdf_path, "wb") as f:
+            writer.write(f)
+
+    def tearDown(self):
+        os.remove(self.pdf_path)
+
+    def test_falls_back_to_pypdf_when_pymupdf_cannot_extract(self):
+        fake_pymupdf = mock.Mock()
+        fake_pymupdf.open.return_value = _UnextractablePdf()
+        with mock.patch.object(document_loader, "pymupdf", fake_pymupdf):
+            pages = list(document_loader._iter_pdf_pages(self.pdf_path))
+
+        self.assertEqual([page.metadata["page"] for page in pages], [0, 1])
+        self.assertTrue(all(page.metadata["source"] == self.pdf_path for page in pages))
+
+
+class XlsxHeadTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.xlsx_path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(handle)
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet.append(["name", "name", None, "name.1", "qty"])
+        worksheet.append(["a", None, 1, "x", 3])
+        worksheet.append([None, "b", 2, None, None])
+        worksheet.append(["c", "d", 3, "y", 5])
+        workbook.save(self.xlsx_path)
+
+    def tearDown(self):
+        os.remove(self.xlsx_path)
+
+    def test_matches_pandas_for_empty_cells_and_repeated_headers(self):
+        df, n_rows = document_loader._xlsx_head(self.xlsx_path, 2)
+        expected = pd.read_excel(self.xlsx_path, nrows=2)
+
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(df.to_string(), expected.to_string())
+        self.assertEqual(n_rows, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
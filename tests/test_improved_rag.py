@@ -0,0 +1,84 @@
+"""
+Tests for the improved RAG pipeline's answer cache
+"""
+
+import os
+import asyncio
+import tempfile
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("BASE_PATH", tempfile.gettempdir())
+
+from langchain.memory import ConversationBufferMemory
+
+from src.improved_rag import ImprovedRAGPipeline, ANSWER_CACHE_THRESHOLD, ANSWER_CLUSTER_THRESHOLD
+from src.semantic_cache import CentroidCache
+
+
+class _SameVectorEmbeddings:
+    """Embeds every question to the same vector, the worst case for a similarity cache"""
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+class _EchoChain:
+    """Conversation chain stand-in that answers with the question it was asked"""
+
+    async def ainvoke(self, inputs):
+        return {"answer": f"answer to {inputs['question']}"}
+
+
+class _Manager:
+    embeddings = _SameVectorEmbeddings()
+
+
+def _pipeline() -> ImprovedRAGPipeline:
+    pipeline = ImprovedRAGPipeline.__new__(ImprovedRAGPipeline)
+    pipeline.vector_store_manager = _Manager()
+    pipeline.conversation_chain = _EchoChain()
+    # Earlier turns from another session are in the shared memory
+    pipeline.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+    pipeline.memory.save_context({"question": "Who leads the SQL Server upgrade?"}, {"answer": "Alice"})
+    pipeline.answer_cache = CentroidCache(ANSWER_CACHE_THRESHOLD, ANSWER_CLUSTER_THRESHOLD)
+    return pipeline
+
+
+class AnswerCacheTest(unittest.TestCase):
+
+    def test_distinct_project_questions_do_not_share_an_answer(self):
+        pipeline = _pipeline()
+        first = asyncio.run(pipeline.aask_question("Tell me about the SQL Server upgrade project"))
+        second = asyncio.run(pipeline.aask_question("Tell me about the Database Migration upgrade project"))
+
+        self.assertEqual(first["answer"], "answer to Tell me about the SQL Server upgrade project")
+        self.assertEqual(second["answer"], "answer to Tell me about the Database Migration upgrade project")
+        self.assertFalse(second.get("cached", False))
+        self.assertEqual(len(pipeline.answer_cache), 0)
+
+    def test_paraphrased_project_list_is_served_from_cache(self):
+        pipeline = _pipeline()
+        calls = []
+        
+        async def list_projects(question):
+            calls.append(question)
+            return {"question": question, "answer": "Projects: A, B", "success": True}
+        
+        pipeline._handle_comprehensive_project_query = list_projects
+        first = asyncio.run(pipeline.aask_question("What projects is the company working on?"))
+        second = asyncio.run(pipeline.aask_question("List all current projects"))
+
+        self.assertFalse(first.get("cached", False))
+        self.assertTrue(second.get("cached", False))
+        self.assertEqual(second["answer"], "Projects: A, B")
+        self.assertEqual(calls, ["What projects is the company working on?"])
+
+    def test_follow_up_is_not_answered_from_cache(self):
+        pipeline = _pipeline()
+        self.assertFalse(pipeline._answer_cacheable("What projects are there? Tell me more"))
+        self.assertTrue(pipeline._answer_cacheable("What projects is the company working on?"))
+
+
+if __name__ == "__main__":
+    unittest.main()
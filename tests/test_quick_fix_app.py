@@ -0,0 +1,62 @@
+"""
+Tests for the QuickFix pipeline's semantic answer cache
+"""
+
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("BASE_PATH", tempfile.gettempdir())
+
+from langchain.memory import ConversationBufferMemory
+
+from quick_fix_app import QuickFixRAGPipeline
+from src.semantic_cache import SemanticCache
+
+
+class _NearDuplicateEmbeddings:
+    """Embeds questions about contracts to nearly the same vector"""
+
+    def embed_query(self, text):
+        return [1.0, 0.01 * len(text), 0.0]
+
+
+class _Manager:
+    embeddings = _NearDuplicateEmbeddings()
+
+    def index_version(self):
+        return "v1"
+
+
+class _CountingChain:
+    """Conversation chain stand-in that counts how often it is asked"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        return {"answer": f"answer to {inputs['question']}"}
+
+
+class SemanticAnswerCacheTest(unittest.TestCase):
+
+    def test_near_duplicate_standalone_question_is_a_cache_hit(self):
+        pipeline = QuickFixRAGPipeline.__new__(QuickFixRAGPipeline)
+        pipeline.vector_store_manager = _Manager()
+        pipeline.conversation_chain = pipeline.project_chain = _CountingChain()
+        pipeline.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+        pipeline.semantic_cache = SemanticCache(threshold=0.95, version="v1")
+
+        first = pipeline.ask_question("What contracts does the company have?")
+        second = pipeline.ask_question("What contracts does the company have")
+
+        self.assertFalse(first.get("cached", False))
+        self.assertTrue(second.get("cached", False))
+        self.assertEqual(second["answer"], first["answer"])
+        self.assertEqual(pipeline.conversation_chain.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()